@@ -292,6 +292,32 @@ def TestTrussHeteroData():
     print(graph)
     
 
+def TestImportTime():
+    import sys
+    import subprocess
+
+    # Global variables
+    CORE_MODULES     = ["slientruss3d.truss", "slientruss3d.type", "slientruss3d.utils", "slientruss3d.ga", "slientruss3d.cache", "slientruss3d.archive", "slientruss3d.shared", "slientruss3d.cli"]
+    HEAVY_MODULES    = ["matplotlib", "tkinter", "turtle", "torch", "torch_geometric"]
+    IMPORT_TIME_LIMIT = 1.0
+
+    # Import the solver core in a fresh interpreter, then check the time and which heavy modules got imported:
+    code = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in CORE_MODULES) +
+        "print(time.perf_counter() - t0)\n"
+        f"print(','.join(module for module in {HEAVY_MODULES!r} if module in sys.modules))\n"
+    )
+    seconds, heavyModules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.splitlines()
+    seconds = float(seconds)
+
+    print(f"Time for importing the solver core = {seconds}(s)")
+    assert not heavyModules, f"The solver core imports heavy modules: {heavyModules}"
+    assert seconds < IMPORT_TIME_LIMIT, f"Importing the solver core takes {seconds}(s) (limit: {IMPORT_TIME_LIMIT}(s))"
+    return seconds
+
+
 if __name__ == '__main__':
     pass
     # TestTimeConsuming()
@@ -301,4 +327,5 @@ if __name__ == '__main__':
     # TestGA()
     # TestGenerateCubeTruss()
     # TestDataAugmentation()
-    # TestTrussHeteroData()
\ No newline at end of file
+    # TestTrussHeteroData()
+    # TestImportTime()
\ No newline at end of file
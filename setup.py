@@ -15,6 +15,7 @@ setup(
         download_url=f"https://github.com/leo27945875/Python_Stable_3D_Truss_Analysis/archive/refs/tags/v{VERSION}.tar.gz",
         packages=['slientruss3d'],
         install_requires=['numpy', 'matplotlib>=3.5.1'], 
+        entry_points={'console_scripts': ['slientruss3d=slientruss3d.cli:main']},
         keywords=['python', 'truss', 'civil engineering', 'structural analysis'],
         classifiers= [
             "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,16 @@
+import importlib
+
+
+# Submodules are imported on first access (e.g. [slientruss3d.plot] needs matplotlib and [slientruss3d.data] and [slientruss3d.physics] need torch),
+# so [import slientruss3d] and the solver core only need numpy:
+_SUBMODULES = {'archive', 'cache', 'cli', 'data', 'ga', 'generate', 'physics', 'plot', 'shared', 'stream', 'truss', 'type', 'utils'}
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
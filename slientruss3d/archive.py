@@ -0,0 +1,162 @@
+import os
+import json
+import numpy as np
+
+from .truss import Truss
+from .type  import SupportType
+from .utils import DimensionError, TrussNotSolvedError
+
+
+class TrussArchive:
+    """
+    An append-only archive of structural analysis results of many load cases or design iterations. The geometry of each model
+    is stored only once, and every case appends one row to each result file, so any case can be read without loading the others
+    and a result can be queried over all cases at once through memory maps.
+
+    Layout of a model folder:
+        dim.npy, joint.npy, support.npy, member.npy      <- geometry (stored once)
+        force.bin, memberType.bin                        <- conditions of each case (one row per case)
+        displace.bin, external.bin, internal.bin         <- results of each case   (one row per case)
+        cases.jsonl                                      <- case keys in the order of rows
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        self.__caseRows = {}
+        os.makedirs(folder, exist_ok=True)
+
+    def GetModelFolder(self, model):
+        return os.path.join(self.folder, str(model))
+
+    def GetModels(self):
+        return sorted(name for name in os.listdir(self.folder) if os.path.isdir(os.path.join(self.folder, name)))
+
+    # Store the geometry of a model (only once):
+    def AddModel(self, model, truss: Truss):
+        modelFolder = self.GetModelFolder(model)
+        if os.path.exists(os.path.join(modelFolder, 'dim.npy')):
+            return
+
+        dim, nJoint, nMember = truss.dim, truss.nJoint, truss.nMember
+        joints, members      = truss.GetJoints(isProtect=False), truss.GetMembers(isProtect=False)
+        os.makedirs(modelFolder, exist_ok=True)
+        np.save(os.path.join(modelFolder, 'joint.npy'  ), np.array([joints[jointID][0] for jointID in range(nJoint)], dtype=np.float64).reshape(nJoint, dim))
+        np.save(os.path.join(modelFolder, 'support.npy'), np.array([joints[jointID][1] for jointID in range(nJoint)], dtype=np.int8))
+        np.save(os.path.join(modelFolder, 'member.npy' ), np.array([members[memberID][:2] for memberID in range(nMember)], dtype=np.int64).reshape(nMember, 2))
+        np.save(os.path.join(modelFolder, 'dim.npy'    ), np.array(dim, dtype=np.int64))
+
+    # Append the conditions and results of a solved truss as a new case of the model:
+    def Append(self, model, case, truss: Truss):
+        if not truss.isSolved:
+            raise TrussNotSolvedError("Haven't done structural analysis yet.")
+
+        self.AddModel(model, truss)
+        geometry = self.GetGeometry(model)
+        dim, nJoint, nMember = int(geometry['dim']), len(geometry['joint']), len(geometry['member'])
+        if (truss.dim, truss.nJoint, truss.nMember) != (dim, nJoint, nMember):
+            raise DimensionError(f"Model [{model}] has (dim, nJoint, nMember) = {(dim, nJoint, nMember)}, but got {(truss.dim, truss.nJoint, truss.nMember)}.")
+
+        caseRows = self.GetCaseRows(model)
+        if case in caseRows:
+            raise KeyError(f"Case [{case}] already exists in model [{model}].")
+
+        rows = {
+            'force'     : truss.GetExternalForceVector(),
+            'memberType': truss.GetMemberTypeArray().ravel(),
+            'displace'  : self.__ToDense(truss.GetDisplacements (isProtect=False), nJoint , dim),
+            'external'  : self.__ToDense(truss.GetExternalForces(isProtect=False), nJoint , dim),
+            'internal'  : self.__ToDense(truss.GetInternalForces(isProtect=False), nMember, None)
+        }
+
+        modelFolder = self.GetModelFolder(model)
+        for key, row in rows.items():
+            with open(os.path.join(modelFolder, f"{key}.bin"), 'ab') as f:
+                f.write(np.ascontiguousarray(row, dtype=np.float64).tobytes())
+
+        with open(os.path.join(modelFolder, 'cases.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(case) + '\n')
+
+        caseRows[case] = len(caseRows)
+
+    @staticmethod
+    def __ToDense(results, n, dim):
+        dense = np.zeros([n, dim] if dim is not None else [n])
+        for i, value in results.items():
+            dense[i] = value
+
+        return dense.ravel()
+
+    def GetGeometry(self, model):
+        modelFolder = self.GetModelFolder(model)
+        return {key: np.load(os.path.join(modelFolder, f"{key}.npy"), mmap_mode='r') for key in ('dim', 'joint', 'support', 'member')}
+
+    # Get a dictionary which maps case keys to row indexes:
+    def GetCaseRows(self, model):
+        if model not in self.__caseRows:
+            casePath, caseRows = os.path.join(self.GetModelFolder(model), 'cases.jsonl'), {}
+            if os.path.exists(casePath):
+                with open(casePath, 'r', encoding='utf-8') as f:
+                    for row, line in enumerate(f):
+                        case = json.loads(line)
+                        caseRows[tuple(case) if isinstance(case, list) else case] = row
+
+            self.__caseRows[model] = caseRows
+
+        return self.__caseRows[model]
+
+    def GetCases(self, model):
+        return list(self.GetCaseRows(model).keys())
+
+    # Get a result over all cases as a read-only memory map with shape (nCase, ...):
+    def GetResults(self, model, key):
+        geometry = self.GetGeometry(model)
+        dim, nJoint, nMember, nCase = int(geometry['dim']), len(geometry['joint']), len(geometry['member']), len(self.GetCaseRows(model))
+        shape = {
+            'force'     : (nCase, nJoint , dim),
+            'memberType': (nCase, nMember, 3  ),
+            'displace'  : (nCase, nJoint , dim),
+            'external'  : (nCase, nJoint , dim),
+            'internal'  : (nCase, nMember     )
+        }[key]
+
+        if nCase == 0:
+            return np.zeros(shape)
+
+        return np.memmap(os.path.join(self.GetModelFolder(model), f"{key}.bin"), dtype=np.float64, mode='r', shape=shape)
+
+    # Get the arrays of one case without loading the others:
+    def GetCaseArrays(self, model, case):
+        row = self.GetCaseRows(model)[case]
+        return {key: self.GetResults(model, key)[row] for key in ('force', 'memberType', 'displace', 'external', 'internal')}
+
+    # Rebuild the solved truss of one case:
+    def LoadCase(self, model, case):
+        geometry, arrays = self.GetGeometry(model), self.GetCaseArrays(model, case)
+        forces, displace, external, internal = np.array(arrays['force']), np.array(arrays['displace']), np.array(arrays['external']), np.array(arrays['internal'])
+        data = {
+            'joint'   : [[position, SupportType.GetFromType(supportType)] for position, supportType in zip(geometry['joint'].tolist(), geometry['support'].tolist())],
+            'force'   : [[jointID, vector] for jointID, vector in enumerate(forces.tolist()) if any(vector)],
+            'member'  : [[connect, memberType] for connect, memberType in zip(geometry['member'].tolist(), arrays['memberType'].tolist())],
+            'displace': [[jointID, vector] for jointID, vector in enumerate(displace.tolist()) if any(vector)],
+            'external': [[jointID, vector] for jointID, vector in enumerate(external.tolist()) if any(vector)],
+            'internal': [[memberID, force] for memberID, force in enumerate(internal.tolist()) if force]
+        }
+        return Truss(int(geometry['dim'])).LoadFromJSON(data=data, isOutputFile=True)
+
+    # Get the max absolute internal stress of each member over all cases (computed chunk by chunk):
+    def GetMaxStresses(self, model, chunkSize=1024):
+        internals, memberTypes = self.GetResults(model, 'internal'), self.GetResults(model, 'memberType')
+        maxStresses = np.zeros([internals.shape[1]])
+        for i in range(0, len(internals), chunkSize):
+            stresses = np.abs(internals[i: i + chunkSize]) / memberTypes[i: i + chunkSize, :, 0]
+            maxStresses = np.maximum(maxStresses, stresses.max(axis=0))
+
+        return maxStresses
+
+    # Get the max displacement length of each joint over all cases (computed chunk by chunk):
+    def GetMaxDisplacements(self, model, chunkSize=1024):
+        displaces = self.GetResults(model, 'displace')
+        maxDisplaces = np.zeros([displaces.shape[1]])
+        for i in range(0, len(displaces), chunkSize):
+            maxDisplaces = np.maximum(maxDisplaces, np.linalg.norm(displaces[i: i + chunkSize], axis=2).max(axis=0))
+
+        return maxDisplaces
@@ -0,0 +1,140 @@
+import os
+import hashlib
+import numpy as np
+
+from .utils import IsZero, IsZeroVector
+
+
+# Hash a sequence of arrays (Each array is hashed as one contiguous block of bytes):
+def HashArrays(arrays, digestSize=20):
+    hasher = hashlib.blake2b(digest_size=digestSize)
+    for array in arrays:
+        array = np.asarray(array)
+        # Shapes are hashed too, and adding 0. turns -0. into 0., so both of them get the same key:
+        hasher.update(np.array(array.shape, dtype=np.int64).tobytes())
+        hasher.update(np.ascontiguousarray(array + 0. if array.dtype == np.float64 else array).tobytes())
+
+    return hasher.hexdigest()
+
+
+class SolveCache:
+    """
+    A persistent cache of structural analysis results on disk. Each truss is addressed by a hash of its canonical content
+    (dimension, joint positions, support types, member connections, member types and external forces), so byte-identical
+    models solved in different processes or runs share the same entry. The total size of the cache is bounded by [maxBytes].
+    When it's exceeded, the least recently used entries are evicted until the size is below [evictRatio * maxBytes], so the
+    folder is only scanned once per many writes.
+
+    Usage:
+        cache = SolveCache('./.truss_cache')
+        truss.Solve(cache=cache)
+    """
+    def __init__(self, folder, maxBytes=1 << 30, evictRatio=0.9):
+        self.folder     = folder
+        self.maxBytes   = maxBytes
+        self.evictRatio = evictRatio
+        self.nHit       = 0
+        self.nMiss      = 0
+        os.makedirs(folder, exist_ok=True)
+        self.__size     = sum(os.path.getsize(path) for path in self.__IterEntryPaths())
+
+    def __repr__(self):
+        return f"SolveCache(folder={self.folder}, size={self.__size}, maxBytes={self.maxBytes}, nHit={self.nHit}, nMiss={self.nMiss})"
+
+    @property
+    def size(self):
+        return self.__size
+
+    # Hash the canonical content of a truss (Every part is hashed as one contiguous array):
+    @staticmethod
+    def GetKey(truss):
+        positions, supports = truss.GetJointArrays()
+        arrays = [
+            np.array([truss.dim, truss.nJoint, truss.nMember], dtype=np.int64),
+            positions,
+            supports,
+            truss.GetConnectArray(),
+            truss.GetMemberTypeArray(),
+            truss.GetExternalForceVector()
+        ]
+
+        return HashArrays(arrays)
+
+    def GetEntryPath(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.npz")
+
+    def __IterEntryPaths(self):
+        for root, _, fileNames in os.walk(self.folder):
+            for fileName in fileNames:
+                if fileName.endswith('.npz'):
+                    yield os.path.join(root, fileName)
+
+    # Get (displace, external, internal) of a truss, or None if it isn't in the cache:
+    def Get(self, truss, key=None):
+        path = self.GetEntryPath(self.GetKey(truss) if key is None else key)
+        try:
+            with np.load(path) as arrays:
+                displace, external, internal = arrays['displace'], arrays['external'], arrays['internal']
+
+            # Mark it as recently used:
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            self.nMiss += 1
+            return None
+
+        self.nHit += 1
+        return ({jointID : d for jointID in range(len(displace)) if not IsZeroVector(d := displace[jointID])},
+                {jointID : f for jointID in range(len(external)) if not IsZeroVector(f := external[jointID])},
+                {memberID: f for memberID, f in enumerate(internal.tolist()) if not IsZero(f)})
+
+    # Store (displace, external, internal) of a truss:
+    def Put(self, truss, results, key=None):
+        dim, nJoint, nMember = truss.dim, truss.nJoint, truss.nMember
+        displace, external, internal = results
+        arrays = {'displace': np.zeros([nJoint, dim]), 'external': np.zeros([nJoint, dim]), 'internal': np.zeros([nMember])}
+        for jointID , vector in displace.items(): arrays['displace'][jointID ] = vector
+        for jointID , vector in external.items(): arrays['external'][jointID ] = vector
+        for memberID, force  in internal.items(): arrays['internal'][memberID] = force
+
+        # Write into a temporary file first, so other processes never read a partial entry:
+        path = self.GetEntryPath(self.GetKey(truss) if key is None else key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        oldSize, tmpPath = os.path.getsize(path) if os.path.exists(path) else 0, f"{path}.{os.getpid()}.tmp"
+        with open(tmpPath, 'wb') as f:
+            np.savez(f, **arrays)
+
+        os.replace(tmpPath, path)
+        self.__size += os.path.getsize(path) - oldSize
+        if self.__size > self.maxBytes:
+            self.Evict()
+
+    # Remove the least recently used entries until the cache fits in [targetBytes] (default: [evictRatio * maxBytes]):
+    def Evict(self, targetBytes=None):
+        targetBytes = int(self.maxBytes * self.evictRatio) if targetBytes is None else targetBytes
+        entries = []
+        for path in self.__IterEntryPaths():
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                pass
+
+        entries.sort()
+        self.__size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.__size <= targetBytes:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            self.__size -= size
+
+    # Remove all entries:
+    def Clear(self):
+        for path in list(self.__IterEntryPaths()):
+            os.remove(path)
+
+        self.__size = 0
@@ -0,0 +1,126 @@
+import os
+import sys
+import glob
+import json
+import argparse
+import numpy as np
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .truss import Truss
+from .cache import SolveCache
+from .utils import TrussNotStableError
+
+
+# Name of the output file, e.g. [bar-10_input_0.json] -> [bar-10_output_0.json]:
+def GetOutputPath(inputPath, outputFolder):
+    name = os.path.basename(inputPath)
+    return os.path.join(outputFolder, name.replace('_input_', '_output_') if '_input_' in name else name)
+
+
+# Solve cache of each worker process (See [SolveFolder]):
+_workerCache = None
+
+def _InitSolveWorker(cacheFolder, cacheBytes):
+    global _workerCache
+    _workerCache = SolveCache(cacheFolder, cacheBytes) if cacheFolder is not None else None
+
+
+# Solve one file in a worker process and write its output:
+def SolveFile(inputPath, outputPath, dim=None, isFast=False):
+    t0 = perf_counter()
+    try:
+        with open(inputPath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        dim   = len(data['joint'][0][0]) if dim is None else dim
+        truss = Truss(dim).LoadFromJSON(data=data)
+        del data
+
+        truss.Solve(_workerCache)
+        truss.DumpIntoJSON(outputPath, isFast)
+        return inputPath, 'solved', None, perf_counter() - t0
+
+    except (TrussNotStableError, np.linalg.LinAlgError) as e:
+        return inputPath, 'unstable', str(e), perf_counter() - t0
+
+    except Exception as e:
+        return inputPath, 'failed', f"{type(e).__name__}: {e}", perf_counter() - t0
+
+
+def SolveFolder(inputFolder, outputFolder, dim=None, pattern='*.json', nWorker=None, nInFlight=None, isFast=False, isPrintMessage=True, cacheFolder=None, cacheBytes=1 << 30):
+    nWorker   = os.cpu_count() if nWorker is None else nWorker
+    nInFlight = 2 * nWorker    if nInFlight is None else nInFlight
+    os.makedirs(outputFolder, exist_ok=True)
+
+    # Output files (e.g. [bar-10_output_0.json]) are never inputs, and files with the same output path are skipped
+    # except the first one, so no two workers write the same file:
+    t0, results, pending, nextIndex = perf_counter(), [], set(), 0
+    inputPaths, outputPaths, skippedPaths = [], {}, []
+    for inputPath in sorted(glob.glob(os.path.join(inputFolder, pattern))):
+        if '_output_' in os.path.basename(inputPath):
+            continue
+
+        outputPath = GetOutputPath(inputPath, outputFolder)
+        if outputPath in outputPaths:
+            skippedPaths.append(inputPath)
+            results.append((inputPath, 'skipped', f"same output path as {outputPaths[outputPath]}", 0.))
+        else:
+            inputPaths.append(inputPath)
+            outputPaths[outputPath] = inputPath
+
+    nFile = len(inputPaths) + len(skippedPaths)
+    if isPrintMessage:
+        for inputPath, status, message, seconds in results:
+            print(f"[{'-' :>6s}/{nFile :6d}] {status :8s} {seconds :8.3f}(s) {inputPath} ({message})")
+
+    # Only [nInFlight] files are loaded at the same time, so memory is bounded no matter how many files there are:
+    with ProcessPoolExecutor(max_workers=nWorker, initializer=_InitSolveWorker, initargs=(cacheFolder, cacheBytes)) as executor:
+        while pending or nextIndex < len(inputPaths):
+            while len(pending) < nInFlight and nextIndex < len(inputPaths):
+                inputPath = inputPaths[nextIndex]
+                pending.add(executor.submit(SolveFile, inputPath, GetOutputPath(inputPath, outputFolder), dim, isFast))
+                nextIndex += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                inputPath, status, message, seconds = result = future.result()
+                results.append(result)
+                if isPrintMessage:
+                    print(f"[{len(results) :6d}/{nFile :6d}] {status :8s} {seconds :8.3f}(s) {inputPath}" + (f" ({message})" if message else ""))
+
+    # Summary:
+    elapsed = perf_counter() - t0
+    counts  = {status: sum(result[1] == status for result in results) for status in ('solved', 'unstable', 'failed', 'skipped')}
+    if isPrintMessage:
+        print('-' * 50)
+        print(f"Files: {len(results)}, solved: {counts['solved']}, unstable: {counts['unstable']}, failed: {counts['failed']}, skipped: {counts['skipped']}")
+        print(f"Time: {elapsed :.3f}(s), throughput: {len(results) / elapsed if elapsed > 0 else 0. :.2f} files/s")
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='slientruss3d', description='3D and 2D truss structural analysis.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solveParser = commands.add_parser('solve', help='Solve all truss JSON files in a folder in parallel.')
+    solveParser.add_argument('input' , help='Folder of input JSON files.')
+    solveParser.add_argument('output', help='Folder to write output JSON files.')
+    solveParser.add_argument('--dim'      , type=int, choices=[2, 3], default=None, help='Dimension of trusses (inferred from each file by default).')
+    solveParser.add_argument('--pattern'  , default='*.json', help='Glob pattern of input files (default: *.json, output files like *_output_*.json are always excluded).')
+    solveParser.add_argument('--workers'  , type=int, default=None, help='Number of worker processes (default: number of CPUs).')
+    solveParser.add_argument('--in-flight', type=int, default=None, help='Max number of files being solved at the same time (default: 2 * workers).')
+    solveParser.add_argument('--fast'     , action='store_true', help='Use the fast JSON writer.')
+    solveParser.add_argument('--quiet'    , action='store_true', help='Do not print any message.')
+    solveParser.add_argument('--cache'    , default=None, help='Folder of the on-disk solve cache (disabled by default).')
+    solveParser.add_argument('--cache-mb' , type=int, default=1024, help='Max size of the solve cache in MB (default: 1024).')
+
+    args = parser.parse_args(argv)
+    if args.command == 'solve':
+        results = SolveFolder(args.input, args.output, args.dim, args.pattern, args.workers, args.in_flight, args.fast, not args.quiet, args.cache, args.cache_mb << 20)
+        return 0 if all(status == 'solved' for _, status, _, _ in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,33 @@
+import os
+import glob
+import json
+import random
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from scipy.sparse import coo_matrix, csr_matrix
 
 import torch
-from torch_geometric.data import HeteroData
+from torch.utils.data import IterableDataset, get_worker_info
+from torch_geometric.data import HeteroData, Dataset
 
 from .truss import Truss
-from .type  import MemberType, SupportType, MetapathType, TaskType
-from .utils import GetCenter, GetAngles, TrussNotSolvedError, InvalidTaskTypeError
+from .generate import GenerateRandomCubeTruss
+from .cache import HashArrays
+from .type  import MemberType, SupportType, MetapathType, TaskType, MEMBER_TYPES
+from .utils import IsZero, TrussNotSolvedError, TrussNotStableError, InvalidTaskTypeError
 
 
 class TrussHeteroDataCreator:
-    def __init__(self, metapathType: MetapathType = MetapathType.NO_IMPLICIT, taskType: TaskType = TaskType.OPTIMIZATION):
+    def __init__(self, metapathType: MetapathType = MetapathType.NO_IMPLICIT, taskType: TaskType = TaskType.OPTIMIZATION, nFixedCache=256, nEdgeCache=256):
         self.metapathType = metapathType
         self.taskType     = taskType
+        self.nFixedCache  = nFixedCache
+        self.nEdgeCache   = nEdgeCache
         self.jointIndexToID, self.memberIndexToID, self.source, self.truss = [], [], None, None
+        self.__fixedCache = OrderedDict()   # {key of (topology, supports, loads, fixedMemberType): (fixedInternals, fixedDisplaces)}
+        self.__edgeCache  = OrderedDict()   # {key of (metapathType, topology): edge tensors}
 
     def FromJSON(self, trussJSONFile: str, trussDim: int, forceScale=1., displaceScale=1., positionScale=1., usedMemberTypes: list[MemberType] = None, 
                        fixedMemberType=MemberType(1., 1e7, 0.1), isUseFixed=True, isOutputFile=False):
@@ -20,13 +35,14 @@ class TrussHeteroDataCreator:
         if not isOutputFile: 
             truss.Solve()
 
-        fixedInternals, fixedDisplaces = self.__GetFixedInternalAndDisplace(truss, fixedMemberType) if isUseFixed else (None, None)
         self.truss    , self.source    = truss, trussJSONFile
+        arrays = self.__GetArrays(truss)
+        fixedInternals, fixedDisplaces = self.__GetFixedInternalsAndDisplaces(truss, arrays, fixedMemberType, [truss.GetForces(isProtect=False)])[0] if isUseFixed else (None, None)
         return self.__CreateGraphData(
             truss, 
-            self.__CreateJointData (truss, forceScale, positionScale, displaceScale , fixedDisplaces ), 
-            self.__CreateMemberData(truss, forceScale, positionScale, fixedInternals, usedMemberTypes), 
-            *self.__CreateEdges(truss)
+            self.__CreateJointData (truss, arrays, forceScale, positionScale, displaceScale , fixedDisplaces ), 
+            self.__CreateMemberData(truss, arrays, forceScale, positionScale, fixedInternals, usedMemberTypes), 
+            *self.__CreateEdges(truss, arrays)
         )
     
     def FromTruss(self, truss: Truss, forceScale=1., displaceScale=1., positionScale=1., usedMemberTypes: list[MemberType] = None, 
@@ -34,49 +50,64 @@ class TrussHeteroDataCreator:
         if not truss.isSolved:
             truss.Solve()
 
-        fixedInternals, fixedDisplaces = self.__GetFixedInternalAndDisplace(truss, fixedMemberType) if isUseFixed else (None, None)
         self.truss    , self.source    = truss, trussSrc
+        arrays = self.__GetArrays(truss)
+        fixedInternals, fixedDisplaces = self.__GetFixedInternalsAndDisplaces(truss, arrays, fixedMemberType, [truss.GetForces(isProtect=False)])[0] if isUseFixed else (None, None)
         return self.__CreateGraphData(
             truss, 
-            self.__CreateJointData (truss, forceScale, positionScale, displaceScale , fixedDisplaces ), 
-            self.__CreateMemberData(truss, forceScale, positionScale, fixedInternals, usedMemberTypes), 
-            *self.__CreateEdges(truss)
+            self.__CreateJointData (truss, arrays, forceScale, positionScale, displaceScale , fixedDisplaces ), 
+            self.__CreateMemberData(truss, arrays, forceScale, positionScale, fixedInternals, usedMemberTypes), 
+            *self.__CreateEdges(truss, arrays)
         )
-
-    def AddDenseEdges(self, graphData: HeteroData):
+    
+    # Build one HeteroData for each load case of a truss (All load cases are solved with one factorization of K):
+    def FromLoadCases(self, truss: Truss, forcesList: list[dict], forceScale=1., displaceScale=1., positionScale=1., usedMemberTypes: list[MemberType] = None, 
+                            fixedMemberType=MemberType(1., 1e7, 0.1), isUseFixed=True, trussSrc=None):
+        self.truss    , self.source    = truss, trussSrc
+        arrays  = self.__GetArrays(truss)
+        members = truss.GetMembers(isProtect=False)
+        results = truss.SolveLoadCases(forcesList)
+        fixeds  = self.__GetFixedInternalsAndDisplaces(truss, arrays, fixedMemberType, forcesList) if isUseFixed else [(None, None)] * len(forcesList)
+        edges   = self.__CreateEdges(truss, arrays)
+
+        graphs, nJoint, dim = [], len(arrays['jointIDs']), truss.dim
+        for forces, (displaces, _, internals), (fixedInternals, fixedDisplaces) in zip(forcesList, results, fixeds):
+            caseArrays = {**arrays, 'forces': self.__ToDense(forces, arrays['jointIndexes'], nJoint, dim)}
+            stresses   = {memberID: force / members[memberID][2].a for memberID, force in internals.items()}
+            graphs.append(self.__CreateGraphData(
+                truss, 
+                self.__CreateJointData (truss, caseArrays, forceScale, positionScale, displaceScale , fixedDisplaces , displaces), 
+                self.__CreateMemberData(truss, caseArrays, forceScale, positionScale, fixedInternals, usedMemberTypes, stresses ), 
+                *edges,
+                isSolved=True
+            ))
+
+        return graphs
+
+    # Add fully connected relations ([isImplicit]: only mark them by [isFullyConnected] without materializing O(n^2) edge_index):
+    def AddDenseEdges(self, graphData: HeteroData, isImplicit=False):
         if not self.truss:
             raise RuntimeError("No truss has been assigned.")
 
         nJoint, nMember = self.truss.nJoint, self.truss.nMember
-
-        jointToMemberEdge = [[], []]
-        for i in range(nJoint):
-            for j in range(nMember):
-                jointToMemberEdge[0].append(i)
-                jointToMemberEdge[1].append(j)
-
-        memberToJointEdge = [jointToMemberEdge[1], jointToMemberEdge[0]]
-        graphData['joint' , 'jFCm', 'member'].edge_index = torch.tensor(jointToMemberEdge, dtype=torch.long)
-        graphData['member', 'mFCj', 'joint' ].edge_index = torch.tensor(memberToJointEdge, dtype=torch.long)
-
+        relations = [('joint', 'jFCm', 'member', nJoint, nMember, False), ('member', 'mFCj', 'joint', nJoint, nMember, True)]
         if self.metapathType == MetapathType.USE_IMPLICIT:
-            jointToJointEdge = [[], []]
-            for i in range(nJoint):
-                for j in range(nJoint): 
-                    jointToJointEdge[0].append(i)
-                    jointToJointEdge[1].append(j)
-
-            memberToMemberEdge = [[], []]
-            for i in range(nMember):
-                for j in range(nMember): 
-                    memberToMemberEdge[0].append(i)
-                    memberToMemberEdge[1].append(j)
+            relations += [('joint', 'jFCj', 'joint', nJoint, nJoint, False), ('member', 'mFCm', 'member', nMember, nMember, False)]
 
-            graphData['joint' , 'jFCj', 'joint' ].edge_index = torch.tensor(jointToJointEdge  , dtype=torch.long)
-            graphData['member', 'mFCm', 'member'].edge_index = torch.tensor(memberToMemberEdge, dtype=torch.long)
+        for srcType, relation, dstType, nRow, nCol, isFlip in relations:
+            if isImplicit:
+                graphData[srcType, relation, dstType].edge_index       = torch.empty((2, 0), dtype=torch.long)
+                graphData[srcType, relation, dstType].isFullyConnected = True
+            else:
+                edgeIndex = self.GetDenseEdgeIndex(nRow, nCol)
+                graphData[srcType, relation, dstType].edge_index       = edgeIndex.flip(0) if isFlip else edgeIndex
 
         return graphData
     
+    # Get the edge_index which connects every source node to every destination node (Source-major order):
+    @staticmethod
+    def GetDenseEdgeIndex(nSrc, nDst):
+        return torch.stack([torch.arange(nSrc).repeat_interleave(nDst), torch.arange(nDst).repeat(nSrc)])
 
     def AddMasterNode(self, graphData: HeteroData, embeddingDim=1, fillValue=1.):
         if not self.truss:
@@ -84,199 +115,396 @@ class TrussHeteroDataCreator:
         
         nJoint, nMember = self.truss.nJoint, self.truss.nMember
 
-        jointToMasterEdge  = [[i for i in range(nJoint )], [0 for _ in range(nJoint )]]
-        masterToJointEdge  = [[0 for _ in range(nJoint )], [i for i in range(nJoint )]]
-        memberToMasterEdge = [[i for i in range(nMember)], [0 for _ in range(nMember)]]
-        masterToMemberEdge = [[0 for _ in range(nMember)], [i for i in range(nMember)]]
+        jointToMasterEdge  = torch.stack([torch.arange(nJoint ), torch.zeros(nJoint , dtype=torch.long)])
+        memberToMasterEdge = torch.stack([torch.arange(nMember), torch.zeros(nMember, dtype=torch.long)])
 
-        graphData['master'].x = torch.tensor([[fillValue] for _ in range(embeddingDim)])
-        graphData['joint' , 'j2M', 'master'].edge_index = torch.tensor(jointToMasterEdge , dtype=torch.long)
-        graphData['master', 'M2j', 'joint' ].edge_index = torch.tensor(masterToJointEdge , dtype=torch.long)
-        graphData['member', 'm2M', 'master'].edge_index = torch.tensor(memberToMasterEdge, dtype=torch.long)
-        graphData['master', 'M2m', 'member'].edge_index = torch.tensor(masterToMemberEdge, dtype=torch.long)
+        graphData['master'].x = torch.full((embeddingDim, 1), fillValue)
+        graphData['joint' , 'j2M', 'master'].edge_index = jointToMasterEdge
+        graphData['master', 'M2j', 'joint' ].edge_index = jointToMasterEdge .flip(0)
+        graphData['member', 'm2M', 'master'].edge_index = memberToMasterEdge
+        graphData['master', 'M2m', 'member'].edge_index = memberToMasterEdge.flip(0)
 
         return graphData
     
     @staticmethod
     def __GetEdgeFromSparse(csrMat: csr_matrix):
-        csrMat[csrMat > 1] = 1
+        csrMat.sort_indices()
         cooMat = coo_matrix(csrMat)
-        row, col = cooMat.row.tolist(), cooMat.col.tolist()
-        return [row, col]
+        return np.stack([cooMat.row, cooMat.col]).astype(np.int64)
     
+    # Get (internal stresses, displacements) of each load case when all members are [fixedMemberType]:
+    def __GetFixedInternalsAndDisplaces(self, truss: Truss, arrays, fixedMemberType: MemberType, forcesList):
+        # The results only depend on the topology, supports, loads and [fixedMemberType], so they are cached by them:
+        nJoint, dim = len(arrays['jointIDs']), truss.dim
+        fixedType   = MEMBER_TYPES.Intern(fixedMemberType)
+        baseArrays  = [arrays['jointIDs'], arrays['memberIDs'], arrays['positions'], arrays['supportTypes'], arrays['connects'], np.array(fixedType.Serialize())]
+        keys        = [HashArrays(baseArrays + [self.__ToDense(forces, arrays['jointIndexes'], nJoint, dim)]) for forces in forcesList]
+        cache       = self.__fixedCache
+
+        # Solve all missing load cases together:
+        missing = list(dict.fromkeys(key for key in keys if key not in cache))
+        if missing:
+            fixedTruss = truss.Copy()
+            for memberID in fixedTruss.GetMemberIDs():
+                fixedTruss.SetMemberType(memberID, fixedType)
+
+            caseForces = {key: forces for key, forces in zip(keys, forcesList)}
+            for key, (displaces, _, internals) in zip(missing, fixedTruss.SolveLoadCases([caseForces[key] for key in missing])):
+                cache[key] = ({memberID: force / fixedType.a for memberID, force in internals.items()}, displaces)
+
+        results = []
+        for key in keys:
+            cache.move_to_end(key)
+            results.append(cache[key])
+
+        while len(cache) > max(self.nFixedCache, len(set(keys))):
+            cache.popitem(last=False)
+
+        return results
+    
+    # Gather the arrays of a truss which all features and edges are computed from:
+    def __GetArrays(self, truss: Truss):
+        dim, joints, members = truss.dim, truss.GetJoints(isProtect=False), truss.GetMembers(isProtect=False)
+        jointIDs   = np.array(list(joints.keys()) , dtype=np.int64)
+        memberIDs  = np.array(list(members.keys()), dtype=np.int64)
+
+        # Map joint IDs to joint indexes (The same order as the joints in the truss):
+        jointIndexes = np.full([jointIDs.max() + 1 if len(jointIDs) else 0], -1, dtype=np.int64)
+        jointIndexes[jointIDs] = np.arange(len(jointIDs))
+
+        supportTypes = np.array([supportType for _, supportType in joints.values()], dtype=np.int64)
+
+        self.jointIndexToID [:] = jointIDs .tolist()
+        self.memberIndexToID[:] = memberIDs.tolist()
+        return {
+            'jointIDs' : jointIDs,
+            'memberIDs': memberIDs,
+            'positions': np.array([position for position, _ in joints.values()], dtype=np.float64).reshape(-1, dim),
+            'supports' : (supportTypes != SupportType.NO).astype(np.float64),
+            'supportTypes': supportTypes,
+            'forces'   : self.__ToDense(truss.GetForces(isProtect=False), jointIndexes, len(jointIDs), dim),
+            'connects' : jointIndexes[np.array([(jointID0, jointID1) for jointID0, jointID1, _ in members.values()], dtype=np.int64).reshape(-1, 2)],
+            'lengths'  : np.array([member.length for _, _, member in members.values()], dtype=np.float64),
+            'areas'    : truss.GetMemberTypeArray()[:, 0],
+            'typeCodes': truss.GetMemberTypeCodes(),
+            'jointIndexes': jointIndexes
+        }
+
+    # Convert {ID: value} into a dense array padded by 0 (IDs are mapped to indexes by [indexes]):
     @staticmethod
-    def __GetFixedInternalAndDisplace(truss: Truss, fixedMemberType: MemberType):
-        truss = truss.Copy()
-        for memberID in truss.GetMemberIDs():
-            truss.SetMemberType(memberID, fixedMemberType)
+    def __ToDense(values, indexes, n, width=None):
+        dense = np.zeros([n, width] if width is not None else [n])
+        if values:
+            dense[indexes[np.fromiter(values.keys(), dtype=np.int64, count=len(values))]] = np.array(list(values.values()), dtype=np.float64).reshape(-1, *dense.shape[1:])
+
+        return dense
 
-        truss.Solve()
-        return truss.GetInternalStresses(), truss.GetDisplacements()
+    # Get (cos(theta), sin(theta), sin(phi), cos(phi)) of each member, which is the same as [GetAngles] row by row:
+    @staticmethod
+    def __GetAngles(p0, p1):
+        vec      = np.where((p0[:, -1] < p1[:, -1])[:, None], p1 - p0, p0 - p1)
+        vLength  = np.sqrt((vec ** 2.).sum(axis=1))
+        xyLength = np.sqrt((vec[:, :2] ** 2.).sum(axis=1))
+        isZeroXY = IsZero(xyLength)
+        safeXY   = np.where(isZeroXY, 1., xyLength)
+        return np.stack([
+            xyLength / vLength, 
+            vec[:, 2] / vLength, 
+            np.where(isZeroXY, 0., vec[:, 1] / safeXY), 
+            np.where(isZeroXY, 0., vec[:, 0] / safeXY)
+        ], axis=1)
     
-    def __CreateJointData(self, truss, forceScale, positionScale, displaceScale, fixedDisplaces):
-        # Clear the mapping which is from joint indexes in dataset to joint IDs in the truss:
-        self.jointIndexToID.clear()
+    def __CreateJointData(self, truss, arrays, forceScale, positionScale, displaceScale, fixedDisplaces, displaces=None):
+        nJoint, dim, jointIndexes = len(arrays['jointIDs']), truss.dim, arrays['jointIndexes']
+        if self.taskType not in (TaskType.OPTIMIZATION, TaskType.REGRESSION):
+            raise InvalidTaskTypeError(f"Invalid task type [{self.taskType}].")
 
-        # For [optimization] task:
-        if self.taskType == TaskType.OPTIMIZATION:
-            joints, forces, dim, jointData = truss.GetJoints(), truss.GetForces(), truss.dim, {'x': [], 'y': []}
-            for jointID, (position, supportType) in joints.items():
-                # X data:
-                if fixedDisplaces is None:
-                    jointData['x'].append([
-                        *([p / positionScale for p in position]),
-                        *([f / forceScale    for f in forces        [jointID]] if jointID in forces        else [0.] * dim),
-                        float(supportType != SupportType.NO)
-                    ])
-                else:
-                    jointData['x'].append([
-                        *([p / positionScale for p in position]),
-                        *([f / forceScale    for f in forces        [jointID]] if jointID in forces         else [0.] * dim),
-                        *([d / displaceScale for d in fixedDisplaces[jointID]] if jointID in fixedDisplaces else [0.] * dim),
-                        float(supportType != SupportType.NO)
-                    ])
-
-                # Record a mapping which is from joint indexes in dataset to joint IDs in the truss:
-                self.jointIndexToID.append(jointID)
-
-        # For [regression] task:
-        elif self.taskType == TaskType.REGRESSION:
-            joints, forces, displaces, dim, jointData = truss.GetJoints(), truss.GetForces(), truss.GetDisplacements(), truss.dim, {'x': [], 'y': []}
-            for jointID, (position, supportType) in joints.items():
-                # X data:
-                if fixedDisplaces is None:
-                    jointData['x'].append([
-                        *([p / positionScale for p in position]),
-                        *([f / forceScale    for f in forces        [jointID]] if jointID in forces         else [0.] * dim),
-                        float(supportType != SupportType.NO)
-                    ])
-                else:
-                    jointData['x'].append([
-                        *([p / positionScale for p in position]),
-                        *([f / forceScale    for f in forces        [jointID]] if jointID in forces         else [0.] * dim),
-                        *([d / displaceScale for d in fixedDisplaces[jointID]] if jointID in fixedDisplaces else [0.] * dim),
-                        float(supportType != SupportType.NO)
-                    ])
-
-                # Y data:
+        # X data:
+        columns = [arrays['positions'] / positionScale, arrays['forces'] / forceScale]
+        if fixedDisplaces is not None:
+            columns.append(self.__ToDense(fixedDisplaces, jointIndexes, nJoint, dim) / displaceScale)
+
+        jointData = {'x': np.concatenate(columns + [arrays['supports'][:, None]], axis=1), 'y': None}
+
+        # Y data (For [regression] task):
+        if self.taskType == TaskType.REGRESSION:
+            if displaces is None:
                 if not truss.isSolved: raise TrussNotSolvedError("Must do structural analysis first to create regression targets.")
-                target = [d / displaceScale for d in displaces[jointID].tolist()] if jointID in displaces else [0.] * truss.dim
-                jointData['y'].append(target)
+                displaces = truss.GetDisplacements(isProtect=False)
 
-                # Record a mapping which is from joint indexes in dataset to joint IDs in the truss:
-                self.jointIndexToID.append(jointID)
-        else:
-            raise InvalidTaskTypeError(f"Invalid task type [{self.taskType}].")
+            jointData['y'] = self.__ToDense(displaces, jointIndexes, nJoint, dim) / displaceScale
 
         return jointData
     
-    def __CreateMemberData(self, truss, forceScale, positionScale, fixedInternals, usedMemberTypes):
-        # Clear the mapping which is from member indexes in dataset to member IDs in the truss:
-        self.memberIndexToID.clear()
+    def __CreateMemberData(self, truss, arrays, forceScale, positionScale, fixedInternals, usedMemberTypes, stresses=None):
+        positions, connects, nMember = arrays['positions'], arrays['connects'], len(arrays['memberIDs'])
+        if self.taskType not in (TaskType.OPTIMIZATION, TaskType.REGRESSION):
+            raise InvalidTaskTypeError(f"Invalid task type [{self.taskType}].")
+
+        # Map member IDs to member indexes (For internal forces and stresses):
+        memberIndexes = np.full([arrays['memberIDs'].max() + 1 if nMember else 0], -1, dtype=np.int64)
+        memberIndexes[arrays['memberIDs']] = np.arange(nMember)
+
+        # X data:
+        p0, p1  = positions[connects[:, 0]], positions[connects[:, 1]]
+        columns = [0.5 * (p0 + p1) / positionScale, self.__GetAngles(p0, p1), arrays['lengths'][:, None] / positionScale]
+        if fixedInternals is not None:
+            columns.append(self.__ToDense(fixedInternals, memberIndexes, nMember)[:, None] / forceScale)
+
+        if self.taskType == TaskType.REGRESSION:
+            columns.append(arrays['areas'][:, None])
+
+        memberData = {'x': np.concatenate(columns, axis=1), 'y': None}
 
-        # For [optimization] task:
+        # Y data:
         if self.taskType == TaskType.OPTIMIZATION:
-            joints, members, memberData = truss.GetJoints(), truss.GetMembers(), {'x': [], 'y': []}
-            for memberID, (jointID0, jointID1, member) in members.items():
-                # X data:
-                p0, p1 = joints[jointID0][0], joints[jointID1][0]
-                if fixedInternals is None:
-                    memberData['x'].append([
-                        *[p / positionScale for p in GetCenter(p0, p1)],
-                        *GetAngles(p0, p1),
-                        member.length / positionScale
-                    ])
-                else:
-                    memberData['x'].append([
-                        *[p / positionScale for p in GetCenter(p0, p1)],
-                        *GetAngles(p0, p1),
-                        member.length / positionScale,
-                        (fixedInternals[memberID] / forceScale if memberID in fixedInternals else 0.)
-                    ])
-
-                # Y data (for imiation learning):
-                if usedMemberTypes is not None:
-                    memberData['y'].append([usedMemberTypes.index(member.memberType)])
-
-                # Record a mapping which is from member indexes in dataset to member IDs in the truss:
-                self.memberIndexToID.append(memberID)
-        
-        # For [regression] task:
-        elif self.taskType == TaskType.REGRESSION:
-            joints, members, stresses, memberData = truss.GetJoints(), truss.GetMembers(), truss.GetInternalStresses(), {'x': [], 'y': []}
-            for memberID, (jointID0, jointID1, member) in members.items():
-                # X data:
-                if fixedInternals is None:
-                    p0, p1 = joints[jointID0][0], joints[jointID1][0]
-                    memberData['x'].append([
-                        *[p / positionScale for p in GetCenter(p0, p1)],
-                        *GetAngles(p0, p1),
-                        member.length / positionScale,
-                        member.memberType.a
-                    ])
-                else:
-                    p0, p1 = joints[jointID0][0], joints[jointID1][0]
-                    memberData['x'].append([
-                        *[p / positionScale for p in GetCenter(p0, p1)],
-                        *GetAngles(p0, p1),
-                        member.length / positionScale,
-                        (fixedInternals[memberID] / forceScale if memberID in fixedInternals else 0.),
-                        member.memberType.a
-                    ])
-
-                # Y data:
+            # For imiation learning:
+            if usedMemberTypes is not None:
+                memberData['y'] = MEMBER_TYPES.GetIndexes(arrays['typeCodes'], usedMemberTypes)[:, None]
+        else:
+            if stresses is None:
                 if not truss.isSolved: raise TrussNotSolvedError("Must do structural analysis first to create regression targets.")
-                memberData['y'].append([stresses[memberID] / forceScale] if memberID in stresses else [0.])
+                stresses = truss.GetInternalStresses()
 
-                # Record a mapping which is from member indexes in dataset to member IDs in the truss:
-                self.memberIndexToID.append(memberID)
-        else:
-            raise InvalidTaskTypeError(f"Invalid task type [{self.taskType}].")
+            memberData['y'] = self.__ToDense(stresses, memberIndexes, nMember)[:, None] / forceScale
         
         return memberData
     
-    def __CreateEdges(self, truss):
-        if not (self.jointIndexToID and self.memberIndexToID):
+    # Edges only depend on the topology, so graphs of the same topology (e.g. load cases and member type variants) share the same tensors:
+    def __CreateEdges(self, truss, arrays):
+        nJoint, nMember = len(arrays['jointIDs']), len(arrays['memberIDs'])
+        if not (nJoint and nMember):
             raise ValueError("not (self.jointIndexToID and self.memberIndexToID)")
 
-        jointIndexList, memberIndexList = [], []
-        for i, (_, (jointID0, jointID1, _)) in enumerate(truss.GetMembers().items()):
-            jointIndexList.extend([self.jointIndexToID.index(jointID0), self.jointIndexToID.index(jointID1)])
-            memberIndexList.extend([i, i])
-        
-        jointToMemberEdge = [jointIndexList, memberIndexList]
-        memberToJointEdge = [memberIndexList, jointIndexList]
+        key, cache = HashArrays([np.array([self.metapathType, nJoint, nMember]), arrays['connects']]), self.__edgeCache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        cache[key] = [None if edge is None else self.__ToTensor(edge, np.int64) for edge in self.__CreateEdgeArrays(arrays, nJoint, nMember)]
+        while len(cache) > self.nEdgeCache:
+            cache.popitem(last=False)
+
+        return cache[key]
+
+    def __CreateEdgeArrays(self, arrays, nJoint, nMember):
 
-        jointToMemberAdj  = coo_matrix(([1] * len(jointIndexList) , jointToMemberEdge), shape=(truss.nJoint , truss.nMember))
-        memberToJointAdj  = coo_matrix(([1] * len(memberIndexList), memberToJointEdge), shape=(truss.nMember, truss.nJoint ))
+        # Each member links to its two joints (in the order of members):
+        jointIndexes  = arrays['connects'].ravel()
+        memberIndexes = np.repeat(np.arange(nMember, dtype=np.int64), 2)
+        jointToMemberEdge = np.stack([jointIndexes, memberIndexes])
+        memberToJointEdge = np.stack([memberIndexes, jointIndexes])
         
         if self.metapathType == MetapathType.USE_IMPLICIT:
+            ones = np.ones([len(jointIndexes)], dtype=np.int64)
+            jointToMemberAdj   = csr_matrix((ones, (jointIndexes, memberIndexes)), shape=(nJoint , nMember))
+            memberToJointAdj   = csr_matrix((ones, (memberIndexes, jointIndexes)), shape=(nMember, nJoint ))
             jointToJointEdge   = self.__GetEdgeFromSparse(jointToMemberAdj @ memberToJointAdj)
             memberToMemberEdge = self.__GetEdgeFromSparse(memberToJointAdj @ jointToMemberAdj)
             return [jointToMemberEdge, memberToJointEdge, jointToJointEdge, memberToMemberEdge]
 
         return [jointToMemberEdge, memberToJointEdge, None, None]
     
-    def __CreateGraphData(self, truss, jointData, memberData, jointToMemberEdge, memberToJointEdge, jointToJointEdge=None, memberToMemberEdge=None):
+    @staticmethod
+    def __ToTensor(array, dtype):
+        return torch.from_numpy(np.ascontiguousarray(array, dtype=dtype))
+    
+    def __CreateGraphData(self, truss, jointData, memberData, jointToMemberEdge, memberToJointEdge, jointToJointEdge=None, memberToMemberEdge=None, isSolved=None):
         bigraphData = HeteroData()
         bigraphData['src'] = self.source
         bigraphData['originWeight'] = truss.weight
 
-        bigraphData['joint'] .x = torch.tensor(jointData ['x'], dtype=torch.float32)
-        bigraphData['member'].x = torch.tensor(memberData['x'], dtype=torch.float32)
+        bigraphData['joint'] .x = self.__ToTensor(jointData ['x'], np.float32)
+        bigraphData['member'].x = self.__ToTensor(memberData['x'], np.float32)
 
-        if jointData ['y']: bigraphData['joint'].y = torch.tensor(jointData['y'], dtype=torch.float32)
-        if memberData['y']: 
-            if truss.isSolved:
-                bigraphData['member'].y = torch.tensor(memberData['y'], dtype=torch.float32)
+        if jointData ['y'] is not None: bigraphData['joint'].y = self.__ToTensor(jointData['y'], np.float32)
+        if memberData['y'] is not None: 
+            if (truss.isSolved if isSolved is None else isSolved):
+                bigraphData['member'].y = self.__ToTensor(memberData['y'], np.float32)
             else:
-                bigraphData['member'].y = torch.tensor(memberData['y'], dtype=torch.long)
+                bigraphData['member'].y = self.__ToTensor(memberData['y'], np.int64)
 
-        bigraphData['joint' , 'j2m', 'member'].edge_index = torch.tensor(jointToMemberEdge, dtype=torch.long)
-        bigraphData['member', 'm2j', 'joint' ].edge_index = torch.tensor(memberToJointEdge, dtype=torch.long)
+        bigraphData['joint' , 'j2m', 'member'].edge_index = jointToMemberEdge
+        bigraphData['member', 'm2j', 'joint' ].edge_index = memberToJointEdge
 
         if self.metapathType == MetapathType.USE_IMPLICIT:
-            bigraphData['joint' , 'j2j', 'joint' ].edge_index = torch.tensor(jointToJointEdge  , dtype=torch.long)
-            bigraphData['member', 'm2m', 'member'].edge_index = torch.tensor(memberToMemberEdge, dtype=torch.long)
+            bigraphData['joint' , 'j2j', 'joint' ].edge_index = jointToJointEdge
+            bigraphData['member', 'm2m', 'member'].edge_index = memberToMemberEdge
         
-        return bigraphData
\ No newline at end of file
+        return bigraphData
+
+
+class TrussDataset(Dataset):
+    """
+    A PyG dataset of all truss JSON files in a folder. Every file is converted by [TrussHeteroDataCreator.FromJSON] only once
+    in a process pool, and the graphs are saved into shards of [shardSize] graphs under [root]/processed/<settings key>, where
+    the key is a hash of the dimension and all creator settings. Files are tracked by their content hash, so only new or
+    changed files are processed again, and shards are loaded lazily ([nCachedShard] of them are kept in memory).
+    """
+    def __init__(self, root, trussDim, pattern='*.json', metapathType=MetapathType.NO_IMPLICIT, taskType=TaskType.OPTIMIZATION, creatorKwargs: dict = None,
+                       shardSize=256, nWorker=None, nCachedShard=4, isPrintMessage=True, transform=None):
+        self.trussDim      = trussDim
+        self.pattern       = pattern
+        self.metapathType  = metapathType
+        self.taskType      = taskType
+        self.creatorKwargs = {} if creatorKwargs is None else creatorKwargs
+        self.shardSize     = shardSize
+        self.nCachedShard  = nCachedShard
+        self.__shards      = OrderedDict()
+        super().__init__(root, transform)
+
+        settings = repr((trussDim, metapathType, taskType, sorted(self.creatorKwargs.items())))
+        self.processedFolder = os.path.join(root, 'processed', hashlib.blake2b(settings.encode(), digest_size=8).hexdigest())
+        self.Update(nWorker, isPrintMessage)
+
+    @property
+    def indexPath(self):
+        return os.path.join(self.processedFolder, 'index.json')
+
+    # Process new or changed files and drop removed ones:
+    def Update(self, nWorker=None, isPrintMessage=True):
+        os.makedirs(self.processedFolder, exist_ok=True)
+        index = {}
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+        # Only files whose size or modified time changed are hashed again:
+        files, pendings = {}, []
+        for path in sorted(glob.glob(os.path.join(self.root, self.pattern))):
+            name, stat = os.path.relpath(path, self.root), os.stat(path)
+            entry = index.get(name)
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                files[name] = entry
+                continue
+
+            with open(path, 'rb') as f:
+                contentHash = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+            if entry is not None and entry['hash'] == contentHash:
+                files[name] = {**entry, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+            else:
+                files[name] = {'hash': contentHash, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'shard': None, 'offset': None, 'error': None}
+                pendings.append(name)
+
+        # Process pending files shard by shard (Only [2 * nWorker] shards are in flight):
+        chunks   = [pendings[i: i + self.shardSize] for i in range(0, len(pendings), self.shardSize)]
+        settings = (self.trussDim, self.metapathType, self.taskType, self.creatorKwargs)
+        if chunks:
+            nWorker = os.cpu_count() if nWorker is None else nWorker
+            with ProcessPoolExecutor(max_workers=max(nWorker, 1)) as executor:
+                pending, nextIndex = set(), 0
+                while pending or nextIndex < len(chunks):
+                    while len(pending) < 2 * max(nWorker, 1) and nextIndex < len(chunks):
+                        names     = chunks[nextIndex]
+                        shardName = 'shard-' + hashlib.blake2b(json.dumps([[name, files[name]['hash']] for name in names]).encode(), digest_size=8).hexdigest() + '.pt'
+                        pending.add(executor.submit(_CreateShard, self.root, names, os.path.join(self.processedFolder, shardName), *settings))
+                        nextIndex += 1
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        shardName, results = future.result()
+                        for offset, (name, error) in enumerate(results):
+                            files[name].update({'shard': shardName, 'offset': offset, 'error': error})
+                            if isPrintMessage and error: print(f"Failed to process [{name}]: {error}")
+
+        # Save the index first, then remove the shards which are no longer used:
+        with open(self.indexPath + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(files, f)
+        os.replace(self.indexPath + '.tmp', self.indexPath)
+
+        usedShards = set(entry['shard'] for entry in files.values())
+        for shardPath in glob.glob(os.path.join(self.processedFolder, 'shard-*.pt')):
+            if os.path.basename(shardPath) not in usedShards:
+                os.remove(shardPath)
+
+        self.__shards.clear()
+        self.__entries = [(entry['shard'], entry['offset']) for entry in files.values() if entry['error'] is None]
+        if isPrintMessage:
+            print(f"Files: {len(files)}, processed: {len(pendings)}, failed: {len(files) - len(self.__entries)}")
+
+    def len(self):
+        return len(self.__entries)
+
+    def get(self, idx):
+        shardName, offset = self.__entries[idx]
+        if shardName in self.__shards:
+            self.__shards.move_to_end(shardName)
+        else:
+            self.__shards[shardName] = _LoadShard(os.path.join(self.processedFolder, shardName))
+            if len(self.__shards) > self.nCachedShard:
+                self.__shards.popitem(last=False)
+
+        return self.__shards[shardName][offset]
+
+
+class TrussStreamDataset(IterableDataset):
+    """
+    A stream of random cube trusses for training on fresh data. Each truss is generated by [GenerateRandomCubeTruss] (with
+    [generateKwargs], including the augmenter), solved if the task needs it and converted by [TrussHeteroDataCreator.FromTruss]
+    (with [creatorKwargs]) inside the DataLoader workers, so memory stays constant and no file is written. The stream is endless
+    if [nSample] is None, otherwise [nSample] graphs are split among the workers. Worker k draws from its own random state seeded
+    by ([seed], epoch, k), so the streams are reproducible for the same [seed] and number of workers.
+    """
+    def __init__(self, numCubeRange=(5, 5), nSample=None, seed=None, metapathType=MetapathType.NO_IMPLICIT, taskType=TaskType.OPTIMIZATION, 
+                       generateKwargs: dict = None, creatorKwargs: dict = None, transform=None):
+        super().__init__()
+        self.numCubeRange   = numCubeRange
+        self.nSample        = nSample
+        self.seed           = seed
+        self.metapathType   = metapathType
+        self.taskType       = taskType
+        self.generateKwargs = {} if generateKwargs is None else generateKwargs
+        self.creatorKwargs  = {} if creatorKwargs  is None else creatorKwargs
+        self.transform      = transform
+        self.epoch          = 0
+
+    # Use different streams in different epochs (Call it before iterating the DataLoader of each epoch):
+    def SetEpoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        workerInfo = get_worker_info()
+        workerID, nWorker = (0, 1) if workerInfo is None else (workerInfo.id, workerInfo.num_workers)
+
+        # Without [seed], workers use the global random state which is seeded differently by the DataLoader:
+        rng = random if self.seed is None else random.Random(f"{self.seed}-{self.epoch}-{workerID}")
+
+        nSample = None if self.nSample is None else self.nSample // nWorker + (workerID < self.nSample % nWorker)
+        creator = TrussHeteroDataCreator(self.metapathType, self.taskType)
+        generateKwargs = {**self.generateKwargs, 'isDoStructuralAnalysis': self.taskType == TaskType.REGRESSION or self.generateKwargs.get('isDoStructuralAnalysis', False)}
+
+        i = 0
+        while nSample is None or i < nSample:
+            try:
+                truss = GenerateRandomCubeTruss(rng.randint(*self.numCubeRange), **generateKwargs, rng=rng)
+            except TrussNotStableError:
+                continue
+
+            graph = creator.FromTruss(truss, trussSrc=f"stream-{self.epoch}-{workerID}-{i}", **self.creatorKwargs)
+            yield graph if self.transform is None else self.transform(graph)
+            i += 1
+
+
+def _LoadShard(path):
+    try:
+        return torch.load(path, weights_only=False)
+    except TypeError:
+        # Old versions of torch have no [weights_only]:
+        return torch.load(path)
+
+
+# Convert a chunk of files into one shard in a worker process (Graphs of failed files are saved as None to keep offsets):
+def _CreateShard(root, names, shardPath, trussDim, metapathType, taskType, creatorKwargs):
+    creator, graphs, results = TrussHeteroDataCreator(metapathType, taskType), [], []
+    for name in names:
+        try:
+            graphs .append(creator.FromJSON(os.path.join(root, name), trussDim, **creatorKwargs))
+            results.append((name, None))
+        except Exception as e:
+            graphs .append(None)
+            results.append((name, f"{type(e).__name__}: {e}"))
+
+    torch.save(graphs, shardPath + '.tmp')
+    os.replace(shardPath + '.tmp', shardPath)
+    return os.path.basename(shardPath), results
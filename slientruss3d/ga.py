@@ -1,4 +1,10 @@
+import os
 import random
+import heapq
+import json
+import bisect
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from .truss import Truss
 from .type  import MemberType
 from .utils import (EliteNumberTooMuchError, 
@@ -26,7 +32,13 @@ class GA:
             pCrossover      : float            = 0.7    ,
             pMutate         : float            = 0.1    ,
             pOrigin         : float            = 0.1    ,
-            isCheckWorst    : bool             = False
+            isCheckWorst    : bool             = False  ,
+            isPruneByWeight : bool             = False  ,
+            isPruneFeasible : bool             = False  ,
+            loadCases       : list[dict]       = None   ,
+            isCacheFitness  : bool             = False  ,
+            callbacks       : list             = None   ,
+            metricsLogPath  : str              = None
         ):
         # Population settings:
         self.nPop          = nPop
@@ -44,12 +56,33 @@ class GA:
         self.truss         = truss
         self.allowStress   = allowStress
         self.allowDisplace = allowDisplace
+        self.loadCases     = loadCases
         self.typeList      = memberTypeList
         self.nMember       = self.truss.nMember
         self.nType         = len(memberTypeList)
         self.memberIDList  = self.truss.GetMemberIDs()
         self.memberIDMap   = {typeID: memberID for typeID, memberID in enumerate(self.memberIDList)}
 
+        # Weight-bound pruning settings:
+        self.isPruneByWeight = isPruneByWeight or isPruneFeasible
+        self.isPruneFeasible = isPruneFeasible
+        self.memberLengths   = [self.truss.GetMembers(isProtect=False)[memberID][2].length for memberID in self.memberIDList]
+        self.typeUnitWeights = [memberType.a * memberType.density for memberType in memberTypeList]
+        self.nPruned         = 0
+        self.nPrunedHistory  = []
+
+        # Fitness cache settings:
+        self.isCacheFitness  = isCacheFitness
+        self.nCacheHit       = 0
+        self.__fitnessCache  = {}
+
+        # Instrumentation settings:
+        self.callbacks        = [] if callbacks is None else callbacks
+        self.metricsLogPath   = metricsLogPath
+        self.isRecordMetrics  = bool(self.callbacks) or metricsLogPath is not None
+        self.metricsHistory   = []
+        self.__metrics        = None
+
         # Feasible record:
         self.__lastFeasibleGene    = [None for _ in range(self.nMember)]
         self.__lastFeasibleFitness = None
@@ -57,6 +90,12 @@ class GA:
         # Rationality:
         self.CheckRatioality(isCheckWorst)
 
+    # Callbacks and caches are not sent to worker processes:
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['callbacks'], state['_GA__metrics'], state['_GA__fitnessCache'] = [], None, {}
+        return state
+
     @property
     def memberTypeWeightedInitProb(self):
         return [1. for _ in self.typeList]
@@ -68,7 +107,7 @@ class GA:
                 if isSorted: break
 
     def CheckRatioality(self, isCheckWorst):
-        truss, allowStress, allowDisplace  = self.truss, self.allowStress, self.allowDisplace
+        truss = self.truss
 
         # Chech whether number of elites <= number of population:
         if self.nElite > self.nPop:
@@ -95,16 +134,14 @@ class GA:
             for memberID in self.memberIDList:
                 truss.SetMemberType(memberID, maxAType)
 
-            truss.Solve()
-            if not truss.IsInternalStressAllowed(allowStress)[0]:
+            if not self.GetViolations(truss)[0]:
                 raise MinStressTooLargeError("Minimum stress is too large. Need other member types which have more [A] value.")
 
             # Check whether minimum displacement is smaller than allowable displacement:
             for memberID in self.memberIDList:
                 truss.SetMemberType(memberID, maxEAType)
 
-            truss.Solve()
-            if not truss.IsDisplacementAllowed(allowDisplace)[0]:
+            if not self.GetViolations(truss)[2]:
                 raise MinDisplaceTooLargeError("Minimum displacement is too large. Need other member types which have more [E*A] value.")
     
     def GetBestFeasibleGene(self, pop, isDirectlyReturnRecord=False):
@@ -136,12 +173,44 @@ class GA:
         
         return truss
     
+    # Get the weight of the truss assigned by a gene without doing structural analysis:
+    def GetWeight(self, gene):
+        typeUnitWeights = self.typeUnitWeights
+        return sum(length * typeUnitWeights[locus] for length, locus in zip(self.memberLengths, gene))
+
+    # Do structural analysis and get the sum of violations over all load cases:
+    def GetViolations(self, truss):
+        allowStress, allowDisplace, metrics = self.allowStress, self.allowDisplace, self.__metrics
+        if metrics is not None: 
+            t0 = perf_counter()
+
+        if self.loadCases is None:
+            truss.Solve()
+            results = [(None, None, None)]
+        else:
+            results = truss.SolveLoadCases(self.loadCases)
+
+        if metrics is not None:
+            t1 = perf_counter()
+            metrics['timeSolve'] += t1 - t0
+            metrics['nSolve'   ] += 1
+
+        isInternalAllowed, internalViolation, isDisplaceAllowed, displaceViolation = True, 0., True, 0.
+        for displaces, _, internals in results:
+            isAllowed, violation = truss.IsInternalStressAllowed(allowStress, True, internals=internals)
+            isInternalAllowed, internalViolation = isInternalAllowed and isAllowed, internalViolation + violation
+
+            isAllowed, violation = truss.IsDisplacementAllowed(allowDisplace, True, displaces=displaces)
+            isDisplaceAllowed, displaceViolation = isDisplaceAllowed and isAllowed, displaceViolation + violation
+        
+        if metrics is not None:
+            metrics['timePenalty'] += perf_counter() - t1
+
+        return isInternalAllowed, internalViolation, isDisplaceAllowed, displaceViolation
+
     def GetFitness(self, gene):
         truss = self.SetMemberTypesByGene(gene, self.truss)
-        truss.Solve()
-
-        isInternalAllowed, internalViolation = truss.IsInternalStressAllowed(self.allowStress, True)
-        isDisplaceAllowed, displaceViolation = truss.IsDisplacementAllowed(self.allowDisplace, True)
+        isInternalAllowed, internalViolation, isDisplaceAllowed, displaceViolation = self.GetViolations(truss)
 
         fitness = truss.weight
         if not isInternalAllowed: fitness += internalViolation / self.allowStress   * 1e5
@@ -153,12 +222,65 @@ class GA:
         return [random.choices(range(nType), k=nMember, weights=typeChosenProbs) for _ in range(self.nPop)]
     
     def Select(self, pop, isRecordFeasible=False):
-        fitnessFunc = self.GetFitness
+        fitnessFunc = self.GetFitness if not self.isCacheFitness else self.GetCachedFitness()
+        fitnessFunc = fitnessFunc     if not self.isPruneByWeight else self.GetPrunedFitness(fitnessFunc)
         pop      = sorted([[gene, fitnessFunc(gene)] for gene in pop], key=lambda x: x[1][0])
         elitePop = [gene for gene, _ in pop[:self.nElite]]
+        if self.isPruneByWeight: self.nPrunedHistory.append(self.nPruned)
         if isRecordFeasible: self._RecordFeasible(pop, isSorted=True)
+        if self.__metrics is not None: self._RecordPopMetrics(pop)
         return elitePop, pop[0][1]
     
+    # Get a fitness function which reuses the fitness of genes evaluated in this or the last selection:
+    def GetCachedFitness(self):
+        fitnessFunc, lastCache, cache = self.GetFitness, self.__fitnessCache, {}
+        self.__fitnessCache, self.nCacheHit = cache, 0
+
+        def CachedFitness(gene):
+            key = tuple(gene)
+            if (fitnessInfo := cache.get(key)) is None:
+                if (fitnessInfo := lastCache.get(key)) is None:
+                    fitnessInfo = fitnessFunc(gene)
+                else:
+                    self.nCacheHit += 1
+
+                cache[key] = fitnessInfo
+            else:
+                self.nCacheHit += 1
+
+            return fitnessInfo
+
+        return CachedFitness
+
+    # Get a fitness function which skips structural analysis for genes whose weight alone exceeds the current bound.
+    # A fitness is never less than the weight, so a pruned gene can't be an elite, and it's only pruned if its weight is also
+    # not less than the best feasible fitness so far, so it can't be a new feasible record either:
+    def GetPrunedFitness(self, fitnessFunc=None):
+        nElite, fitnessFunc, weightFunc = self.nElite, self.GetFitness if fitnessFunc is None else fitnessFunc, self.GetWeight
+        eliteHeap, feasibleBound = [], (self.__lastFeasibleFitness if self.__lastFeasibleFitness is not None else INF)
+        isPruneFeasible = self.isPruneFeasible
+        self.nPruned = 0
+
+        def PrunedFitness(gene):
+            nonlocal feasibleBound
+            eliteBound = -eliteHeap[0] if len(eliteHeap) >= nElite else INF
+            if (weight := weightFunc(gene)) >= feasibleBound and (weight > eliteBound or (isPruneFeasible and weight > feasibleBound)):
+                self.nPruned += 1
+                return weight, False, False
+
+            fitness, isInternalAllowed, isDisplaceAllowed = fitnessInfo = fitnessFunc(gene)
+            if len(eliteHeap) < nElite:
+                heapq.heappush(eliteHeap, -fitness)
+            elif fitness < eliteBound:
+                heapq.heapreplace(eliteHeap, -fitness)
+
+            if isInternalAllowed and isDisplaceAllowed and fitness < feasibleBound:
+                feasibleBound = fitness
+
+            return fitnessInfo
+
+        return PrunedFitness
+
     def Crossover(self, gene0, gene1):
         cut0, cut1 = random.sample(range(self.nMember), k=2)
         cut0, cut1 = (cut0, cut1) if cut0 <= cut1 else (cut1, cut0)
@@ -189,9 +311,49 @@ class GA:
         
         return newPop
     
+    # Record the statistics of an evaluated and sorted population into the metrics of this iteration:
+    def _RecordPopMetrics(self, evaluatedPop):
+        metrics, nPop = self.__metrics, len(evaluatedPop)
+        fitnesses = [fitness for _, (fitness, _, _) in evaluatedPop]
+        locusCounts = [{} for _ in range(self.nMember)]
+        for gene, _ in evaluatedPop:
+            for counts, locus in zip(locusCounts, gene):
+                counts[locus] = counts.get(locus, 0) + 1
+
+        metrics['minFitness'   ] = fitnesses[0]
+        metrics['meanFitness'  ] = sum(fitnesses) / nPop
+        metrics['feasibleRatio'] = sum(isInternalAllowed and isDisplaceAllowed for _, (_, isInternalAllowed, isDisplaceAllowed) in evaluatedPop) / nPop
+        metrics['diversity'    ] = sum(1. - max(counts.values()) / nPop for counts in locusCounts) / self.nMember
+
+    # Finish the metrics of this iteration and send them to callbacks and log file:
+    def _EmitMetrics(self, logFile, **kwargs):
+        metrics = self.__metrics
+        metrics.update(kwargs)
+        metrics['nCacheHit'] = self.nCacheHit if self.isCacheFitness  else 0
+        metrics['nPruned'  ] = self.nPruned   if self.isPruneByWeight else 0
+        self.metricsHistory.append(metrics)
+
+        if logFile is not None:
+            logFile.write(json.dumps(metrics) + '\n')
+            logFile.flush()
+        
+        for callback in self.callbacks:
+            callback(self, metrics)
+
+        # The emitted metrics are finished, so later evaluations (e.g. of the final result) don't touch them:
+        self.__metrics = None
+
     def Evolve(self, isPrintMessage=True):
-        nIteration, nPatience = self.nIteration, self.nPatience
+        nIteration, nPatience, isRecordMetrics = self.nIteration, self.nPatience, self.isRecordMetrics
+        logFile = open(self.metricsLogPath, 'a', encoding='utf-8') if self.metricsLogPath is not None else None
+        self.metricsHistory.clear()
+        try:
+            return self.__Evolve(isPrintMessage, nIteration, nPatience, isRecordMetrics, logFile)
+        finally:
+            self.__metrics = None
+            if logFile is not None: logFile.close()
 
+    def __Evolve(self, isPrintMessage, nIteration, nPatience, isRecordMetrics, logFile):
         # Initialize:
         pop = self.Initialize()
 
@@ -199,8 +361,15 @@ class GA:
         bestFitness, bestFitnessHistory, nWaitBestIter, isEarlyStopping = INF, [], 0, False
         for i in (range(nIteration) if nIteration is not None else InfinteLoop()):
             
+            # Start to record metrics of this iteration:
+            if isRecordMetrics:
+                self.__metrics = {'iteration': i, 'timeSelect': 0., 'timeSolve': 0., 'timePenalty': 0., 'timeGenetic': 0., 'nSolve': 0}
+                tIter = t0 = perf_counter()
+
             # Select elites:
             elitePop, (minFitness, isInternalAllowed, isDisplaceAllowed) = self.Select(pop, True)
+            if isRecordMetrics:
+                self.__metrics['timeSelect'] = perf_counter() - t0
 
             # Early stopping:
             if minFitness < bestFitness:
@@ -209,6 +378,7 @@ class GA:
                 nWaitBestIter += 1
                 if nWaitBestIter >= nPatience:
                     isEarlyStopping = True
+                    if isRecordMetrics: self._EmitMetrics(logFile, bestFitness=bestFitness, nWaitBestIter=nWaitBestIter, timeTotal=perf_counter() - tIter)
                     break
             
             # Record the best fitness of this iteration:
@@ -216,10 +386,16 @@ class GA:
 
             # Print meaasge of this iteration:
             if isPrintMessage:
-                print(f"\rIteration: {i :6d}, nWaitBestIter: {nWaitBestIter :3d}, minFitness: {minFitness :12.4f}, isInternalAllowed: {str(isInternalAllowed) :5s}, isDisplaceAllowed: {str(isDisplaceAllowed) :5s}", end='')
+                print(f"\rIteration: {i :6d}, nWaitBestIter: {nWaitBestIter :3d}, minFitness: {minFitness :12.4f}, isInternalAllowed: {str(isInternalAllowed) :5s}, isDisplaceAllowed: {str(isDisplaceAllowed) :5s}" + 
+                      (f", nPruned: {self.nPruned :4d}" if self.isPruneByWeight else ""), end='')
 
             # Population update:
-            pop = self.UpdatePop(pop, elitePop)
+            if isRecordMetrics:
+                t0 = perf_counter()
+                pop = self.UpdatePop(pop, elitePop)
+                self._EmitMetrics(logFile, bestFitness=bestFitness, nWaitBestIter=nWaitBestIter, timeGenetic=perf_counter() - t0, timeTotal=perf_counter() - tIter)
+            else:
+                pop = self.UpdatePop(pop, elitePop)
         
         # Print the message if GA early stopped:
         if isPrintMessage:
@@ -235,4 +411,109 @@ class GA:
             minGeneInfo = self.GetFitness(minGene)
             if isPrintMessage: print('-' * 50 + '\n' + "Warning: Cannot find any feasible result, so only return the gene which has lowest fitness." + '\n' + '-' * 50)
         
-        return minGene, minGeneInfo, pop, bestFitnessHistory
\ No newline at end of file
+        return minGene, minGeneInfo, pop, bestFitnessHistory
+    
+    # Get a new offspring from the elites for steady-state evolution:
+    def GetOffspring(self, elitePop):
+        if len(elitePop) < 2:
+            return self.GetRandomGene()
+
+        p = random.random()
+        if p <= self.pCrossover:
+            return self.Crossover(*random.sample(elitePop, k=2))
+        elif p <= self.pCrossover + self.pMutate:
+            return self.Mutate(random.choice(elitePop))
+        else:
+            return self.GetRandomGene()
+
+    def EvolveSteadyState(self, nWorker=None, nInFlight=None, isPrintMessage=True):
+        """
+        Asynchronous steady-state evolution. Fitness values are evaluated in a pool of worker processes, each finished gene is 
+        inserted into the elites as soon as it arrives and a new offspring is dispatched right away. [nIteration] and [nPatience] 
+        are counted in units of [nPop] evaluations.
+        """
+        nWorker    = os.cpu_count() if nWorker is None else nWorker
+        nInFlight  = 2 * nWorker    if nInFlight is None else nInFlight
+        nElite     = self.nElite
+        nEvaluate  = self.nIteration * self.nPop if self.nIteration is not None else INF
+        nPatience  = self.nPatience  * self.nPop
+
+        # Elites sorted by fitness, and initial genes waiting for evaluation:
+        eliteFitnesses, eliteInfos, elitePop, eliteKeys = [], [], [], set()
+        initialPop = self.Initialize()
+
+        bestFitness, bestFitnessHistory, nWaitBestEval, nDone, isEarlyStopping = INF, [], 0, 0, False
+        with ProcessPoolExecutor(max_workers=nWorker, initializer=_InitFitnessWorker, initargs=(self,)) as executor:
+            futures = {}
+            while len(futures) < nInFlight and nDone + len(futures) < nEvaluate:
+                gene = initialPop.pop() if initialPop else self.GetOffspring(elitePop)
+                futures[executor.submit(_GetWorkerFitness, gene)] = gene
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    gene, fitnessInfo = futures.pop(future), future.result()
+                    fitness, nDone    = fitnessInfo[0], nDone + 1
+                    self._RecordFeasible([(gene, fitnessInfo)])
+
+                    # Insert the finished gene into the elites:
+                    if (key := tuple(gene)) not in eliteKeys and (len(elitePop) < nElite or fitness < eliteFitnesses[-1]):
+                        i = bisect.bisect_right(eliteFitnesses, fitness)
+                        eliteFitnesses.insert(i, fitness)
+                        eliteInfos    .insert(i, fitnessInfo)
+                        elitePop      .insert(i, gene)
+                        eliteKeys.add(key)
+                        if len(elitePop) > nElite:
+                            eliteFitnesses.pop(), eliteInfos.pop()
+                            eliteKeys.discard(tuple(elitePop.pop()))
+
+                    # Early stopping:
+                    if fitness < bestFitness:
+                        bestFitness, nWaitBestEval = fitness, 0
+                    else:
+                        nWaitBestEval += 1
+                        if nWaitBestEval >= nPatience:
+                            isEarlyStopping = True
+
+                    # Record the best fitness of every [nPop] evaluations:
+                    if nDone % self.nPop == 0:
+                        bestFitnessHistory.append(bestFitness)
+                        if isPrintMessage:
+                            _, isInternalAllowed, isDisplaceAllowed = eliteInfos[0]
+                            print(f"\rIteration: {nDone // self.nPop - 1 :6d}, nWaitBestIter: {nWaitBestEval // self.nPop :3d}, minFitness: {eliteFitnesses[0] :12.4f}, isInternalAllowed: {str(isInternalAllowed) :5s}, isDisplaceAllowed: {str(isDisplaceAllowed) :5s}", end='')
+
+                # Dispatch new offsprings right away:
+                while not isEarlyStopping and len(futures) < nInFlight and nDone + len(futures) < nEvaluate:
+                    gene = initialPop.pop() if initialPop else self.GetOffspring(elitePop)
+                    futures[executor.submit(_GetWorkerFitness, gene)] = gene
+                
+                if isEarlyStopping:
+                    for future in futures: future.cancel()
+                    break
+
+        # Print the message if GA early stopped:
+        if isPrintMessage:
+            if isEarlyStopping:
+                print('...Early stoping !')
+            else:
+                print("")
+        
+        # Output the final result:
+        minGene, minGeneInfo = self.GetBestFeasibleGene(elitePop, isDirectlyReturnRecord=True)
+        if minGene is None:
+            minGene, minGeneInfo = elitePop[0], eliteInfos[0]
+            if isPrintMessage: print('-' * 50 + '\n' + "Warning: Cannot find any feasible result, so only return the gene which has lowest fitness." + '\n' + '-' * 50)
+        
+        return minGene, minGeneInfo, elitePop, bestFitnessHistory
+
+
+# For the fitness evaluation in worker processes of steady-state GA:
+_workerGA = None
+
+def _InitFitnessWorker(ga):
+    global _workerGA
+    _workerGA = ga
+
+
+def _GetWorkerFitness(gene):
+    return _workerGA.GetFitness(gene)
@@ -1,15 +1,19 @@
 import os
 import json
 import random
+import numpy as np
 from math import ceil
+from operator  import add
+from functools import lru_cache
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 from .truss import Truss
-from .plot  import TrussPlotter
-from .type  import MemberType, LinkType, GenerateMethod
+from .type  import MemberType, LinkType, GenerateMethod, GenerateOutput
 from .utils import GetPowerset, TrussNotStableError, PinNotEnoughError
 
 
-# For data augmentation:
+# For data augmentation (Random augmenters draw numbers from [rng], which is the [random] module or a [random.Random]):
 class TrussDataAugmenter:
     @staticmethod
     def IsTrussClass(trussData):
@@ -31,12 +35,17 @@ class TrussDataAugmenter:
     def GetStableMinNumPin(trussData):
         return ceil((len(trussData['joint']) * 3 - len(trussData['member'])) / 3)
 
+    # Augmenters of [TrussDataAugmenter] share [rng], and other callables only get the truss:
+    @staticmethod
+    def Apply(augmenter, trussData, rng=random):
+        return augmenter(trussData, rng=rng) if isinstance(augmenter, TrussDataAugmenter) else augmenter(trussData)
+
 
 class NoChange(TrussDataAugmenter):
     """
     Do nothing to the truss.
     """
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         return trussData
 
 
@@ -48,11 +57,11 @@ class AddJointNoise(TrussDataAugmenter):
         self.noiseMeans = noiseMeans
         self.noiseStds  = noiseStds
     
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         isTrussClass, _trussData = self.IsTrussClass(trussData)
         jointDict = _trussData['joint']
         for jointData in jointDict:
-            jointData[0][:] = [jointData[0][i] + random.gauss(self.noiseMeans[i], self.noiseStds[i]) for i in range(3)]
+            jointData[0][:] = [jointData[0][i] + rng.gauss(self.noiseMeans[i], self.noiseStds[i]) for i in range(3)]
         
         if isTrussClass:
             trussData.LoadFromJSON(data=_trussData, isOutputFile=trussData.isSolved)
@@ -64,7 +73,7 @@ class MoveToCentroid(TrussDataAugmenter):
     """
     Move the centroid of the truss to [0., 0., 0.].
     """
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         isTrussClass, _trussData = self.IsTrussClass(trussData)
         jointDict = _trussData['joint']
         centroid  = self.GetCentroid(jointDict)
@@ -84,7 +93,7 @@ class Translation(TrussDataAugmenter):
     def __init__(self, translation):
         self.translation = translation
     
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         isTrussClass, _trussData = self.IsTrussClass(trussData)
 
         translation = self.translation
@@ -104,8 +113,8 @@ class RandomTranslation(TrussDataAugmenter):
     def __init__(self, translateRange=[-1., 1.]):
         self.translateRange = translateRange
 
-    def __call__(self, trussData):
-        translation = [random.uniform(*self.translateRange) for _ in range(3)]
+    def __call__(self, trussData, rng=random):
+        translation = [rng.uniform(*self.translateRange) for _ in range(3)]
         return Translation(translation)(trussData)
 
 
@@ -120,12 +129,12 @@ class RandomResetPin(TrussDataAugmenter):
         self.minNumPin      = minNumPin
         self.maxNumPinRatio = maxNumPinRatio
     
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         isTrussClass, _trussData = self.IsTrussClass(trussData)
         jointData = _trussData['joint']
         minNumPin = self.GetStableMinNumPin(_trussData) if self.minNumPin is None else max(self.minNumPin, self.GetStableMinNumPin(_trussData))
         maxNumPin = len(jointData) if self.maxNumPinRatio is None else int(self.maxNumPinRatio * len(jointData))
-        sampledJointIDs = set(random.sample(range(len(jointData)), k=random.choice(range(minNumPin, maxNumPin + 1))))
+        sampledJointIDs = set(rng.sample(range(len(jointData)), k=rng.choice(range(minNumPin, maxNumPin + 1))))
         for jointID, jointData in enumerate(jointData):
             if jointID in sampledJointIDs:
                 jointData[-1] = "PIN"
@@ -141,9 +150,9 @@ class TrussDataAugmenterList(TrussDataAugmenter):
     def __init__(self, *augmenters):
         self.augmenters = augmenters
     
-    def __call__(self, trussData):
+    def __call__(self, trussData, rng=random):
         for augmenter in self.augmenters:
-            trussData = augmenter(trussData)
+            trussData = self.Apply(augmenter, trussData, rng)
         
         return trussData
 
@@ -164,17 +173,18 @@ class CubeTruss:
     def __setitem__(self, i, val):
         self.jointIDs[i] = val
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def GetVertexOffsets(dim):
+        return tuple(tuple(1 if i in indexes else 0 for i in range(dim)) for indexes in GetPowerset(list(range(dim))))
+
     def GetCubeVertices(self):
-        dim = len(self.__coord)
-        vertices = []
-        for indexes in GetPowerset(list(range(dim))):
-            joint = tuple([(v + 1 if i in indexes else v) for i, v in enumerate(self.__coord)])
-            vertices.append(joint)
-        
-        return vertices
+        coord = self.__coord
+        return [tuple(map(add, coord, offset)) for offset in self.GetVertexOffsets(len(coord))]
     
+    # Joint IDs in [usedDict] are 0, 1, 2 ... in the order of insertion, so the max joint ID is the running count of joints:
     def GenerateNew(self, usedDict={}):
-        vertices, maxJointID = self.GetCubeVertices(), max(usedDict.values()) if usedDict.values() else -1
+        vertices, maxJointID = self.GetCubeVertices(), len(usedDict) - 1
         for i, joint in enumerate(vertices):
             if joint in usedDict:
                 self[i] = usedDict[joint]
@@ -183,10 +193,10 @@ class CubeTruss:
                 self[i]         = maxJointID
                 usedDict[joint] = maxJointID
     
-    def LinkMember(self, linkType, hasLinked):
+    def LinkMember(self, linkType, hasLinked, rng=random):
 
         def SampleLink(links, choices, linkType, hasLinked):
-            choice = choices[random.sample(range(len(choices)), k=1)[0]] if linkType == LinkType.Random else choices[linkType]
+            choice = choices[rng.sample(range(len(choices)), k=1)[0]] if linkType == LinkType.Random else choices[linkType]
             if list(filter(lambda x: hasattr(x, '__iter__'), choice)):
                 if hasLinked is None:
                     links.extend(choice)
@@ -231,146 +241,279 @@ class CubeTruss:
         return links
 
 
+# Vertex indexes of the two diagonal links of each face, and of the 12 edges of a cube (Used by [CubeGrid.CubesToTruss]):
+FACE_LINKS  = np.array([[[0, 5], [1, 4]], [[1, 7], [3, 5]], [[3, 6], [2, 7]], [[2, 4], [0, 6]], [[4, 7], [5, 6]], [[0, 3], [1, 2]]])
+CYCLE_LINKS = np.array([[4, 5], [5, 7], [6, 7], [4, 6], [0, 1], [0, 2], [1, 3], [2, 3], [0, 4], [1, 5], [2, 6], [3, 7]])
+
+
 class CubeGrid:
-    def __init__(self, xMax, yMax, zMax):
+    def __init__(self, xMax, yMax, zMax, rng=random):
+        self.__rng  = rng
         self.__xMax = xMax
         self.__yMax = yMax
         self.__zMax = zMax
         self.__usedDict = {}
-        self.grid = [[[False for _ in range(zMax)] for _ in range(yMax)] for _ in range(xMax)]
+        self.grid = np.zeros([xMax, yMax, zMax], dtype=bool)
     
     def __getitem__(self, coordinate):
-        return self.grid[coordinate[0]][coordinate[1]][coordinate[2]]
+        return self.grid[tuple(coordinate)]
     
     def __setitem__(self, coordinate, isUsed):
-        self.grid[coordinate[0]][coordinate[1]][coordinate[2]] = isUsed
+        self.grid[tuple(coordinate)] = isUsed
     
     def IsOutOfRange(self, coordinate):
         return ( coordinate[0] >= self.__xMax or coordinate[0] < 0 or
                  coordinate[1] >= self.__yMax or coordinate[1] < 0 or
                  coordinate[2] >= self.__zMax or coordinate[2] < 0 )
     
+    # Free cells are listed in (z, y, x) order, so the choice is the same as picking from nested loops of z, y and x:
     def GetRandomFeasible(self):
-        return random.choice([(x, y, z) for z in range(self.__zMax) for y in range(self.__yMax) for x in range(self.__xMax) if not self[(x, y, z)]])
+        feasibles = np.argwhere(~self.grid.transpose(2, 1, 0))
+        z, y, x   = feasibles[self.__rng.randrange(len(feasibles))].tolist()
+        return (x, y, z)
     
     def GetNextFeasibles(self, coordinate, isSuffle=True):
-        nextCoords = []
-        for nextDirect in ((-1, 0, 0), (1, 0, 0), (0, -1, 0), (0, 1, 0), (0, 0, -1), (0, 0, 1)):
-            nextCoord = tuple(v0 + v1 for v0, v1 in zip(coordinate, nextDirect))
-            if not self.IsOutOfRange(nextCoord) and not self[nextCoord]:
-                nextCoords.append(nextCoord)
+        (x, y, z), grid = coordinate, self.grid
+        nextCoords = [nextCoord for nextCoord in ((x - 1, y, z), (x + 1, y, z), (x, y - 1, z), (x, y + 1, z), (x, y, z - 1), (x, y, z + 1))
+                      if not self.IsOutOfRange(nextCoord) and not grid[nextCoord]]
         
-        if isSuffle: random.shuffle(nextCoords)
+        if isSuffle: self.__rng.shuffle(nextCoords)
         return nextCoords
     
     def RandomGenerateCubes(self, numCube=None, method=GenerateMethod.DFS):
-        numCube = random.randint(1, self.__xMax * self.__yMax * self.__zMax) if numCube is None else numCube
+        numCube = self.__rng.randint(1, self.__xMax * self.__yMax * self.__zMax) if numCube is None else numCube
         self.__usedDict.clear()
 
-        usedDict, cubes, coords = self.__usedDict, [], [self.GetRandomFeasible()]
+        # The frontier is a deque, and a set of it is kept for membership tests:
+        usedDict, cubes, coords = self.__usedDict, [], deque([self.GetRandomFeasible()])
+        coordSet = set(coords)
         while len(cubes) < numCube and coords:
             if method == GenerateMethod.DFS:
                 coord = coords.pop()
             elif method == GenerateMethod.BFS:
-                coord = coords.pop(0)
+                coord = coords.popleft()
             elif method == GenerateMethod.Random:
-                if random.random() <= 0.5:
+                if self.__rng.random() <= 0.5:
                     coord = coords.pop()
                 else:
-                    coord = coords.pop(0)
+                    coord = coords.popleft()
 
+            coordSet.remove(coord)
             self[coord] = True
-            coords.extend([newCoord for newCoord in self.GetNextFeasibles(coord) if newCoord not in coords])
+            for newCoord in self.GetNextFeasibles(coord):
+                if newCoord not in coordSet:
+                    coords.append(newCoord)
+                    coordSet.add(newCoord)
+
             cubes.append(CubeTruss(coord, usedDict))
         
         return cubes
     
     def ProcessPinSupport(self, isAddPinSupport, length):
-        minZ = float("inf")
-        for _, _, z in self.__usedDict:
-            if z < minZ: minZ = z
-        
-        length = [float(v) for v in length]
-        joints = [None for _ in self.__usedDict]
-        for (x, y, z), jointID in self.__usedDict.items():
-            joints[jointID] = [[float(x * length[0]), float(y * length[1]), float((z - minZ) * length[2])], 
-                                ("PIN" if z == minZ else "NO") if isAddPinSupport else "NO"] 
-        return joints
+        coords = np.zeros([len(self.__usedDict), 3], dtype=np.int64)
+        coords[np.fromiter(self.__usedDict.values(), dtype=np.int64, count=len(self.__usedDict))] = list(self.__usedDict)
+        if len(coords): coords[:, 2] -= coords[:, 2].min()
+
+        positions = (coords * np.array([float(v) for v in length])).tolist()
+        supports  = np.where(coords[:, 2] == 0, "PIN", "NO").tolist() if isAddPinSupport else ["NO"] * len(coords)
+        return [[position, support] for position, support in zip(positions, supports)]
     
     def CubesToTruss(self, cubes, length, isAddPinSupport=True, isAllowParallel=True, linkType=LinkType.Random, memberType=[1., 1e7, 0.1]):
         # Joints:
         joints = self.ProcessPinSupport(isAddPinSupport, length)
 
-        # Members:
-        members, hasLinked = [], None if isAllowParallel else set()
-        for cube in cubes:
-            links = cube.LinkMember(linkType, hasLinked)
-            members.extend([[link, memberType] for link in links])
-        
+        # Choices of the diagonal links on the 6 faces of each cube (0: first link, 1: second link, 2: both of them),
+        # [rng.randrange(3)] draws the same numbers as [rng.sample(range(3), k=1)[0]] in [CubeTruss.LinkMember]:
+        if linkType == LinkType.Random:
+            choices = np.array([[self.__rng.randrange(3) for _ in range(6)] for _ in cubes], dtype=np.int64).reshape(-1, 6)
+        else:
+            choices = np.full([len(cubes), 6], linkType, dtype=np.int64)
+
+        # Links of each cube are [face links ..., cycle links ...], so flattening them keeps the order of cubes:
+        jointIDs   = np.array([cube.jointIDs for cube in cubes], dtype=np.int64).reshape(-1, 8)
+        faceLinks  = jointIDs[:, FACE_LINKS ].reshape(len(cubes), 12, 2)
+        cycleLinks = jointIDs[:, CYCLE_LINKS]
+        faceMasks  = np.stack([choices != 1, choices != 0], axis=2).reshape(len(cubes), 12)
+        links      = np.concatenate([faceLinks, cycleLinks], axis=1)[np.concatenate([faceMasks, np.ones([len(cubes), 12], dtype=bool)], axis=1)]
+
+        # Only keep the first one of the same links (A link (i, j) is encoded as i * nJoint + j):
+        if not isAllowParallel and len(links):
+            links = links[np.sort(np.unique(links[:, 0] * len(joints) + links[:, 1], return_index=True)[1])]
+
         # Serialize:
-        return {'joint': joints, 'force': {}, 'member': members}
+        return {'joint': joints, 'force': {}, 'member': [[link, memberType] for link in links.tolist()]}
 
 
-def GenerateRandomCubeTrusses(gridRange=(5, 5, 5), numCubeRange=(5, 5), numEachRange=(1, 10), lengthRange=(50, 150), forceRange=[(-30000, 30000), (-30000, 30000), (-30000, 30000)], 
-                              nForceRange=None, method=GenerateMethod.Random, linkType=LinkType.Random, memberTypes=[[1., 1e7, 0.1]], isAddPinSupport=True, isAllowParallel=False,
-                              isDoStructuralAnalysis=False, isPlotTruss=False, isPrintMessage=True, saveFolder=None, augmenter=NoChange(), seed=None):
-    
-    def AssignRandomForces(trussData, forceRange, nForceRange):
-        notSupportJoints = [jointID for jointID, (_, supportType) in enumerate(trussData['joint']) if supportType == "NO"]
-        if nForceRange is None:
-            nForce = random.randint(1, len(notSupportJoints))
-        else:
-            nForce = random.randint(1                     if nForceRange[0] is None else nForceRange[0], 
-                                    len(notSupportJoints) if nForceRange[1] is None else nForceRange[1])
+# Assign random external forces to non-support joints of a serialized truss:
+def AssignRandomForces(trussData, forceRange, nForceRange, rng=random):
+    notSupportJoints = [jointID for jointID, (_, supportType) in enumerate(trussData['joint']) if supportType == "NO"]
+    if nForceRange is None:
+        nForce = rng.randint(1, len(notSupportJoints))
+    else:
+        nForce = rng.randint(1                     if nForceRange[0] is None else nForceRange[0], 
+                             len(notSupportJoints) if nForceRange[1] is None else nForceRange[1])
 
-        trussData['force'] = [[jointID, [random.uniform(*forceRange[i]) for i in range(3)]]
-                              for jointID in sorted(random.sample(notSupportJoints, nForce))]
-        return trussData
+    trussData['force'] = [[jointID, [rng.uniform(*forceRange[i]) for i in range(3)]]
+                          for jointID in sorted(rng.sample(notSupportJoints, nForce))]
+    return trussData
+
+
+# Assign a random member type to each member of a serialized truss:
+def AssignRandomMemberType(trussData, memberTypes, rng=random):
+    memberData = trussData['member']
+    for memberID in range(len(memberData)):
+        choice = rng.choice(memberTypes)
+        memberData[memberID][1] = choice.Serialize() if isinstance(choice, MemberType) else choice
     
-    def AssignRandomMemberType(trussData, memberTypes):
-        memberData = trussData['member']
-        for memberID in range(len(memberData)):
-            choice = random.choice(memberTypes)
-            memberData[memberID][1] = choice.Serialize() if isinstance(choice, MemberType) else choice
-        
-        return trussData
+    return trussData
+
+
+# Generate one random cube truss (Raise TrussNotStableError if the generated truss isn't stable). Random numbers are drawn from [rng]
+# (The global random state by default):
+def GenerateRandomCubeTruss(numCube, gridRange=(5, 5, 5), lengthRange=(50, 150), forceRange=[(-30000, 30000), (-30000, 30000), (-30000, 30000)], nForceRange=None, 
+                            method=GenerateMethod.Random, linkType=LinkType.Random, memberTypes=[[1., 1e7, 0.1]], isAddPinSupport=True, isAllowParallel=False,
+                            isDoStructuralAnalysis=False, augmenter=NoChange(), rng=random):
+    cubeGrid  = CubeGrid(*gridRange, rng=rng)
+    cubes     = cubeGrid.RandomGenerateCubes(numCube, method)
+    trussData = cubeGrid.CubesToTruss(cubes, [rng.uniform(*lengthRange) for _ in range(3)], isAddPinSupport, isAllowParallel, linkType)
+    AssignRandomForces      (trussData, forceRange, nForceRange, rng)
+    AssignRandomMemberType  (trussData, memberTypes, rng)
+    truss = Truss(3).LoadFromJSON(data=TrussDataAugmenter.Apply(augmenter, trussData, rng))
+
+    if isDoStructuralAnalysis:
+        truss.Solve()
+    else:
+        if not truss.isStable: raise TrussNotStableError
+    
+    return truss
+
+
+# Generate, save and plot one case of [GenerateRandomCubeTrusses] (Unstable trusses are generated again).
+# If [caseSeed] isn't None, the case draws from its own [random.Random(caseSeed)], so it doesn't depend on other cases
+# and the global random state is left untouched. Otherwise it draws from the global random state:
+def _GenerateCase(numCube, i, caseSeed, generateKwargs, isPlotTruss=False, isPrintMessage=True, saveFolder=None, outputType=GenerateOutput.TRUSS):
+    rng = random if caseSeed is None else random.Random(caseSeed)
+
+    while True:
+        try:
+            if isPrintMessage: 
+                print(f"\rnumCube : {numCube :5d}, case : {i :5d}", end='')
+
+            truss = GenerateRandomCubeTruss(numCube, **generateKwargs, rng=rng)
+            break
+
+        except TrussNotStableError:
+            if isPrintMessage: print("\nTruss is not stable. Re-genrating...\n")
+
+    savePath = None if saveFolder is None else os.path.join(saveFolder, f"cube-{numCube}_case_{i}.json")
+    if saveFolder is not None:
+        truss.DumpIntoJSON(savePath)
+
+    if isPlotTruss:
+        from .plot import TrussPlotter
+        lengthRange = generateKwargs['lengthRange']
+        TrussPlotter(truss, 
+                     maxScaledDisplace=lengthRange[1] * 0.1,
+                     maxScaledForce=lengthRange[1] * 0.6, 
+                     isEqualAxis=True).Plot(isSave=True, 
+                                            savePath=os.path.join(saveFolder, f"cube-{numCube}_plot_{i}.png"))
+    
+    if outputType == GenerateOutput.JSON:
+        return truss.Serialize()
+    elif outputType == GenerateOutput.ARRAYS:
+        return GetTrussArrays(truss)
+    elif outputType == GenerateOutput.PATH:
+        return savePath
+    
+    return truss
+
+
+# Arrays of a truss, which can be rebuilt by [Truss.FromArrays(**arrays)]:
+def GetTrussArrays(truss):
+    dim, nJoint, nMember = truss.dim, truss.nJoint, truss.nMember
+    joints, members      = truss.GetJoints(isProtect=False), truss.GetMembers(isProtect=False)
+    memberTypes          = truss.GetMemberTypeArray().reshape(nMember, 3)
+    return {
+        'coords'      : np.array([joints[jointID][0] for jointID in range(nJoint)], dtype=np.float64).reshape(nJoint, dim),
+        'supports'    : np.array([joints[jointID][1] for jointID in range(nJoint)], dtype=np.int64),
+        'connectivity': np.array([members[memberID][:2] for memberID in range(nMember)], dtype=np.int64).reshape(nMember, 2),
+        'areas'       : memberTypes[:, 0].copy(),
+        'moduli'      : memberTypes[:, 1].copy(),
+        'densities'   : memberTypes[:, 2].copy(),
+        'forces'      : truss.GetExternalForceVector().reshape(nJoint, dim)
+    }
+
+
+def IterRandomCubeTrusses(gridRange=(5, 5, 5), numCubeRange=(5, 5), numEachRange=(1, 10), lengthRange=(50, 150), forceRange=[(-30000, 30000), (-30000, 30000), (-30000, 30000)], 
+                           nForceRange=None, method=GenerateMethod.Random, linkType=LinkType.Random, memberTypes=[[1., 1e7, 0.1]], isAddPinSupport=True, isAllowParallel=False,
+                           isDoStructuralAnalysis=False, isPlotTruss=False, isPrintMessage=False, saveFolder=None, augmenter=NoChange(), seed=None, 
+                           nWorker=None, nInFlight=None, startIndex=0, outputType=GenerateOutput.TRUSS):
+
+    generateKwargs = dict(gridRange=gridRange, lengthRange=lengthRange, forceRange=forceRange, nForceRange=nForceRange, method=method, linkType=linkType, memberTypes=memberTypes, 
+                          isAddPinSupport=isAddPinSupport, isAllowParallel=isAllowParallel, isDoStructuralAnalysis=isDoStructuralAnalysis, augmenter=augmenter)
+    cases = [(numCube, i) for numCube in range(numCubeRange[0], numCubeRange[1] + 1) for i in range(numEachRange[0], numEachRange[1] + 1)][startIndex:]
+
+    # Arguments are checked here, since the generator doesn't run until the first item is requested:
+    if outputType == GenerateOutput.PATH and saveFolder is None:
+        raise ValueError("[saveFolder] is required to output the paths of saved JSON files.")
+
+    # A run with a random seed can't be reproduced, so resuming it from [startIndex] is meaningless:
+    if seed is None and startIndex > 0:
+        raise ValueError("[seed] is required to resume from [startIndex].")
+
+    # Each case has its own seed derived from [seed], so the results don't depend on the number of workers, and [startIndex] resumes exactly:
+    baseSeed = random.getrandbits(64) if seed is None else seed
+    return _IterCases(cases, baseSeed, generateKwargs, isPlotTruss, isPrintMessage, saveFolder, nWorker, nInFlight, outputType)
+
+
+def _IterCases(cases, baseSeed, generateKwargs, isPlotTruss, isPrintMessage, saveFolder, nWorker, nInFlight, outputType):
+    if nWorker is None or nWorker <= 1:
+        for numCube, i in cases:
+            yield _GenerateCase(numCube, i, f"{baseSeed}-{numCube}-{i}", generateKwargs, isPlotTruss, isPrintMessage, saveFolder, outputType)
+        return
+
+    # Workers save files by themselves. Cases are yielded in order, and only [nInFlight] cases are submitted ahead of the consumer,
+    # so a slow consumer holds back the workers, and closing the generator cancels the cases which haven't started:
+    nInFlight = 2 * nWorker if nInFlight is None else nInFlight
+    executor  = ProcessPoolExecutor(max_workers=nWorker)
+    pending, nextIndex = deque(), 0
+    try:
+        while pending or nextIndex < len(cases):
+            while len(pending) < nInFlight and nextIndex < len(cases):
+                numCube, i = cases[nextIndex]
+                pending.append((executor.submit(_GenerateCase, numCube, i, f"{baseSeed}-{numCube}-{i}", generateKwargs, isPlotTruss, False, saveFolder, outputType), numCube, i))
+                nextIndex += 1
+
+            future, numCube, i = pending.popleft()
+            result = future.result()
+            if isPrintMessage: 
+                print(f"\rnumCube : {numCube :5d}, case : {i :5d}", end='')
+
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 
+def GenerateRandomCubeTrusses(gridRange=(5, 5, 5), numCubeRange=(5, 5), numEachRange=(1, 10), lengthRange=(50, 150), forceRange=[(-30000, 30000), (-30000, 30000), (-30000, 30000)], 
+                              nForceRange=None, method=GenerateMethod.Random, linkType=LinkType.Random, memberTypes=[[1., 1e7, 0.1]], isAddPinSupport=True, isAllowParallel=False,
+                              isDoStructuralAnalysis=False, isPlotTruss=False, isPrintMessage=True, saveFolder=None, augmenter=NoChange(), seed=None, 
+                              nWorker=None, nInFlight=None, isReturnTruss=True):
+
+    if not isReturnTruss and saveFolder is None:
+        raise ValueError("[saveFolder] is required to return the paths of saved JSON files instead of Truss objects.")
+
+    # Each case has its own seed with [nWorker]:
+    outputType = GenerateOutput.TRUSS if isReturnTruss else GenerateOutput.PATH
+    if nWorker is not None:
+        return list(IterRandomCubeTrusses(gridRange, numCubeRange, numEachRange, lengthRange, forceRange, nForceRange, method, linkType, memberTypes, isAddPinSupport, isAllowParallel, 
+                                          isDoStructuralAnalysis, isPlotTruss, isPrintMessage, saveFolder, augmenter, seed, nWorker, nInFlight, outputType=outputType))
+
+    # Without [nWorker], all cases draw from the global random state seeded by [seed] (The same results as older versions, but
+    # NOT the same trusses as any [nWorker] for the same seed, since the cases aren't seeded one by one):
+    generateKwargs = dict(gridRange=gridRange, lengthRange=lengthRange, forceRange=forceRange, nForceRange=nForceRange, method=method, linkType=linkType, memberTypes=memberTypes, 
+                          isAddPinSupport=isAddPinSupport, isAllowParallel=isAllowParallel, isDoStructuralAnalysis=isDoStructuralAnalysis, augmenter=augmenter)
     if seed is not None:
         random.seed(seed)
-    
-    trussList = []
-    for numCube in range(numCubeRange[0], numCubeRange[1] + 1):
-        for i in range(numEachRange[0], numEachRange[1] + 1):
-            while True:
-                try:
-                    if isPrintMessage: 
-                        print(f"\rnumCube : {numCube :5d}, case : {i :5d}", end='')
-
-                    cubeGrid  = CubeGrid(*gridRange)
-                    cubes     = cubeGrid.RandomGenerateCubes(numCube, method)
-                    trussData = cubeGrid.CubesToTruss(cubes, [random.uniform(*lengthRange) for _ in range(3)], isAddPinSupport, isAllowParallel, linkType)
-                    AssignRandomForces      (trussData, forceRange, nForceRange)
-                    AssignRandomMemberType  (trussData, memberTypes)
-                    truss = Truss(3).LoadFromJSON(data=augmenter(trussData))
-
-                    if isDoStructuralAnalysis:
-                        truss.Solve()
-                    else:
-                        if not truss.isStable: raise TrussNotStableError
-
-                    if saveFolder is not None:
-                        truss.DumpIntoJSON(os.path.join(saveFolder, f"cube-{numCube}_case_{i}.json"))
-
-                    if isPlotTruss:
-                        TrussPlotter(truss, 
-                                     maxScaledDisplace=lengthRange[1] * 0.1,
-                                     maxScaledForce=lengthRange[1] * 0.6, 
-                                     isEqualAxis=True).Plot(isSave=True, 
-                                                            savePath=os.path.join(saveFolder, f"cube-{numCube}_plot_{i}.png"))
-                    trussList.append(truss)
-                    break
-
-                except TrussNotStableError:
-                    if isPrintMessage: print("\nTruss is not stable. Re-genrating...\n")
-
-    return trussList
\ No newline at end of file
+
+    return [_GenerateCase(numCube, i, None, generateKwargs, isPlotTruss, isPrintMessage, saveFolder, outputType) 
+            for numCube in range(numCubeRange[0], numCubeRange[1] + 1) for i in range(numEachRange[0], numEachRange[1] + 1)]
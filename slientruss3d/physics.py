@@ -0,0 +1,91 @@
+import torch
+
+
+class BatchTrussSolver(torch.nn.Module):
+    """
+    A differentiable direct stiffness solver for a batch of trusses. The stiffness matrices of all trusses in the batch are
+    assembled from joint positions, member connections, areas and Young's moduli, padded to the same size and solved together
+    by [torch.linalg.solve], so gradients flow back to positions, areas, Young's moduli and forces. It's used to compute
+    physics losses or regression labels of whole mini-batches inside the training loop.
+
+    Usage:
+        solver = BatchTrussSolver(dim=3)
+        displaces, internals, stresses = solver.SolveHeteroData(batch, areas=predictedAreas, forceScale=..., positionScale=...)
+    """
+    def __init__(self, dim=3):
+        super().__init__()
+        self.dim = dim
+
+    # Solve displacements (nJoint, dim), internal forces (nMember) and stresses (nMember) of all trusses in the batch:
+    #   [positions] : (nJoint, dim) joint positions.
+    #   [connects]  : (nMember, 2)  joint indexes of each member.
+    #   [areas]     : (nMember)     cross-sectional areas.
+    #   [youngs]    : (nMember) or a scalar Young's modulus.
+    #   [forces]    : (nJoint, dim) external forces.
+    #   [supports]  : (nJoint, dim) masks of the fixed degrees of freedom, or (nJoint) masks of pin supports.
+    #   [batch]     : (nJoint) index of the truss of each joint (All joints belong to one truss if it's None).
+    def forward(self, positions, connects, areas, youngs, forces, supports, batch=None):
+        dim, nJoint, device = self.dim, positions.shape[0], positions.device
+        dtype = positions.dtype if positions.is_floating_point() else torch.float64
+        if batch is None:
+            batch = torch.zeros([nJoint], dtype=torch.long, device=device)
+
+        # Degree of freedom indexes of each joint in its own truss (Every truss is padded to [nDOF]):
+        nGraph  = int(batch.max()) + 1 if nJoint else 0
+        counts  = torch.bincount(batch, minlength=nGraph)
+        starts  = torch.cumsum(counts, 0) - counts
+        indexes = torch.arange(nJoint, device=device) - starts[batch]
+        nDOF    = int(counts.max()) * dim if nJoint else 0
+        dofs    = indexes[:, None] * dim + torch.arange(dim, device=device)
+        graphs  = batch[:, None].expand(-1, dim)
+
+        # Element stiffness k * c * c^T of each member:
+        connects  = connects.long()
+        vectors   = positions[connects[:, 1]] - positions[connects[:, 0]]
+        lengths   = torch.linalg.norm(vectors, dim=1)
+        cosines   = vectors / lengths[:, None]
+        stiffness = youngs * areas / lengths
+        blocks    = stiffness[:, None, None] * cosines[:, :, None] * cosines[:, None, :]
+
+        # Assemble [[K, -K], [-K, K]] of each member into the stiffness matrices:
+        dof0, dof1 = dofs[connects[:, 0]], dofs[connects[:, 1]]
+        rows    = torch.cat([dof0, dof1, dof0, dof1])
+        cols    = torch.cat([dof0, dof1, dof1, dof0])
+        offsets = batch[connects[:, 0]].repeat(4) * nDOF * nDOF
+        entries = offsets[:, None, None] + rows[:, :, None] * nDOF + cols[:, None, :]
+        values  = torch.cat([blocks, blocks, -blocks, -blocks])
+        matK    = torch.zeros([nGraph * nDOF * nDOF], dtype=dtype, device=device).index_add(0, entries.reshape(-1), values.reshape(-1).to(dtype))
+        matK    = matK.view(nGraph, nDOF, nDOF)
+
+        # Fixed and padded degrees of freedom have zero displacements (Their rows and columns are replaced by identity):
+        supports = supports.bool()
+        if supports.dim() == 1:
+            supports = supports[:, None].expand(-1, dim)
+
+        isFree = torch.zeros([nGraph, nDOF], dtype=torch.bool, device=device).index_put((graphs, dofs), ~supports)
+        matK   = torch.where(isFree[:, :, None] & isFree[:, None, :], matK, torch.diag_embed((~isFree).to(dtype)))
+        vecF   = torch.zeros([nGraph, nDOF], dtype=dtype, device=device).index_put((graphs, dofs), torch.where(supports, 0., forces.to(dtype)))
+
+        # Solve all the linear systems together:
+        vecD      = torch.linalg.solve(matK, vecF[:, :, None])[:, :, 0]
+        displaces = vecD[graphs, dofs]
+
+        # Internal forces (Positive for tension):
+        internals = stiffness * ((displaces[connects[:, 1]] - displaces[connects[:, 0]]) * cosines).sum(dim=1)
+        return displaces, internals, internals / areas
+
+    # Solve a (batched) HeteroData created by [TrussHeteroDataCreator]. Positions and forces are scaled back by [positionScale] and
+    # [forceScale], so the results are in the original units. If [areas] is None, the areas in the member features are used
+    # (Only for [TaskType.REGRESSION]). Supports in HeteroData are treated as pin supports:
+    def SolveHeteroData(self, graphData, areas=None, youngs=1e7, forceScale=1., positionScale=1.):
+        dim         = self.dim
+        jointX      = graphData['joint'].x
+        memberIndex = graphData['member', 'm2j', 'joint'].edge_index
+
+        # Every member has two edges, so sorting the edges by members gives the two joints of each member:
+        order    = torch.sort(memberIndex[0], stable=True).indices
+        connects = memberIndex[1][order].view(-1, 2)
+        batch    = graphData['joint'].batch if 'batch' in graphData['joint'] else None
+        areas    = graphData['member'].x[:, -1] if areas is None else areas.view(-1)
+
+        return self(jointX[:, :dim] * positionScale, connects, areas, youngs, jointX[:, dim: 2 * dim] * forceScale, jointX[:, -1] > 0.5, batch)
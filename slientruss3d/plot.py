@@ -1,12 +1,61 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.patches import FancyArrowPatch
+from mpl_toolkits.mplot3d import proj3d
 
 from .truss import Truss
-from .utils import Arrow2D, Arrow3D, IsZero, IsZeroVector, MinNorm, SetAxesEqual
+from .utils import IsZero, IsZeroVector, MinNorm
 from .type import SupportType
 
 
-plt.style.use("seaborn")
+class Arrow3D(FancyArrowPatch):
+    def __init__(self, posA, posB, *args, **kwargs):
+        super().__init__((0,0), (0,0), *args, **kwargs)
+        self._verts3d =  list(zip(posA, posB))
+
+    def do_3d_projection(self, renderer=None):
+        xs3d, ys3d, zs3d = self._verts3d
+        xs, ys, zs = proj3d.proj_transform(xs3d, ys3d, zs3d, self.axes.M)
+        self.set_positions((xs[0],ys[0]),(xs[1],ys[1]))
+        return np.min(zs)
+
+
+class Arrow2D(FancyArrowPatch):
+    pass
+
+
+def SetAxesEqual(ax, dim):
+    if dim == 3:
+        xLimits = ax.get_xlim3d()
+        yLimits = ax.get_ylim3d()
+        zLimits = ax.get_zlim3d()
+
+        xRange = abs(xLimits[1] - xLimits[0])
+        yRange = abs(yLimits[1] - yLimits[0])
+        zRange = abs(zLimits[1] - zLimits[0])
+
+        xMiddle = np.mean(xLimits)
+        yMiddle = np.mean(yLimits)
+        zMiddle = np.mean(zLimits)
+
+        plotRadius = 0.5*max([xRange, yRange, zRange])
+
+        ax.set_xlim3d([xMiddle - plotRadius, xMiddle + plotRadius])
+        ax.set_ylim3d([yMiddle - plotRadius, yMiddle + plotRadius])
+        ax.set_zlim3d([zMiddle - plotRadius, zMiddle + plotRadius])
+    else:
+        ax.set_aspect('equal')
+
+
+# Apply the plot style once when the first truss is plotted (instead of at import time):
+_isStyleApplied = False
+
+def UsePlotStyle():
+    global _isStyleApplied
+    if not _isStyleApplied:
+        plt.style.use("seaborn" if "seaborn" in plt.style.available else "seaborn-v0_8")
+        _isStyleApplied = True
+
 
 class TrussPlotter:
     def __init__(self, truss: Truss, isDisplaceScale=True, isForceScale=True, isEqualAxis=False, isPlotStress=True,
@@ -26,6 +75,7 @@ class TrussPlotter:
         truss = self.truss
         dim   = truss.dim
 
+        UsePlotStyle()
         plt.figure(0, figsize=self.figsize)
         if dim == 3:
             ax = plt.axes(projection='3d')
@@ -0,0 +1,139 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+from .truss import Truss
+
+
+class SharedTruss:
+    """
+    A read-only snapshot of a truss (geometry, connectivity, member properties, loads, member lengths and direction cosines)
+    stored in a block of shared memory. Pickling it only sends the name and layout of the block, so worker processes attach
+    to the same memory zero-copy instead of receiving a pickled truss.
+    """
+    def __init__(self, shm, layout, dim, isOwner):
+        self.__shm     = shm
+        self.__layout  = layout
+        self.__dim     = dim
+        self.__isOwner = isOwner
+        self.__arrays  = {}
+        for key, (offset, shape, dtype) in layout.items():
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self.__arrays[key] = array
+
+    def __repr__(self):
+        return f"SharedTruss(name={self.name}, dim={self.__dim}, nJoint={self.nJoint}, nMember={self.nMember})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+        if self.__isOwner: self.Unlink()
+
+    def __reduce__(self):
+        return SharedTruss.Attach, (self.name, self.__layout, self.__dim)
+
+    @classmethod
+    def FromTruss(cls, truss: Truss):
+        dim, nJoint, nMember = truss.dim, truss.nJoint, truss.nMember
+        joints, members      = truss.GetJoints(isProtect=False), truss.GetMembers(isProtect=False)
+
+        # Collect all arrays of the snapshot:
+        positions   = np.array([joints[jointID][0] for jointID in range(nJoint)], dtype=np.float64).reshape(nJoint, dim)
+        supports    = np.array([joints[jointID][1] for jointID in range(nJoint)], dtype=np.int8)
+        connects    = np.array([members[memberID][:2] for memberID in range(nMember)], dtype=np.int64).reshape(nMember, 2)
+        memberTypes = truss.GetMemberTypeArray().reshape(nMember, 3)
+        forces      = truss.GetExternalForceVector().reshape(nJoint, dim)
+        vectors     = positions[connects[:, 1]] - positions[connects[:, 0]]
+        lengths     = np.linalg.norm(vectors, axis=1)
+        cosines     = vectors / lengths[:, None]
+        arrays      = {'positions': positions, 'supports': supports, 'connects': connects, 'memberTypes': memberTypes,
+                       'forces': forces, 'lengths': lengths, 'cosines': cosines}
+
+        # Lay out all arrays in one block of shared memory (8-byte aligned):
+        layout, offset = {}, 0
+        for key, array in arrays.items():
+            layout[key] = (offset, array.shape, array.dtype.str)
+            offset     += (array.nbytes + 7) // 8 * 8
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, array in arrays.items():
+            start, _, _ = layout[key]
+            shm.buf[start: start + array.nbytes] = array.tobytes()
+
+        return cls(shm, layout, dim, isOwner=True)
+
+    @classmethod
+    def Attach(cls, name, layout, dim):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always tracks the attached block (Child processes share the resource tracker of their parent):
+            shm = shared_memory.SharedMemory(name=name)
+
+        return cls(shm, layout, dim, isOwner=False)
+
+    @property
+    def name(self):
+        return self.__shm.name
+
+    @property
+    def dim(self):
+        return self.__dim
+
+    @property
+    def nJoint(self):
+        return self.__arrays['positions'].shape[0]
+
+    @property
+    def nMember(self):
+        return self.__arrays['connects'].shape[0]
+
+    @property
+    def positions(self):
+        return self.__arrays['positions']
+
+    @property
+    def supports(self):
+        return self.__arrays['supports']
+
+    @property
+    def connects(self):
+        return self.__arrays['connects']
+
+    @property
+    def memberTypes(self):
+        return self.__arrays['memberTypes']
+
+    @property
+    def forces(self):
+        return self.__arrays['forces']
+
+    @property
+    def lengths(self):
+        return self.__arrays['lengths']
+
+    @property
+    def cosines(self):
+        return self.__arrays['cosines']
+
+    @property
+    def weight(self):
+        memberTypes = self.__arrays['memberTypes']
+        return float((memberTypes[:, 0] * memberTypes[:, 2] * self.__arrays['lengths']).sum())
+
+    # Build a normal Truss object from the shared arrays in bulk (The snapshot itself stays read-only, and changes of the
+    # returned truss are never written back to shared memory):
+    def ToTruss(self):
+        memberTypes = self.memberTypes
+        return Truss.FromArrays(self.positions, self.supports, self.connects, memberTypes[:, 0], memberTypes[:, 1], memberTypes[:, 2], self.forces)
+
+    # Close the access to shared memory in this process:
+    def Close(self):
+        self.__arrays.clear()
+        self.__shm.close()
+
+    # Free the shared memory (Only call it in the process which created the snapshot):
+    def Unlink(self):
+        self.__shm.unlink()
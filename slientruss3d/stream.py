@@ -0,0 +1,111 @@
+import json
+import numpy as np
+
+
+class JSONStream:
+    """
+    Read a JSON text from a file chunk by chunk and decode one value at a time, so only the current chunk and the value being
+    decoded are held in memory.
+    """
+    WHITESPACE  = ' \t\n\r'
+    NUMBERCHARS = '0123456789+-.eE'
+
+    def __init__(self, file, chunkSize=1 << 20):
+        self.file      = file
+        self.chunkSize = chunkSize
+        self.buffer    = ''
+        self.pos       = 0
+        self.isEOF     = False
+        self.decoder   = json.JSONDecoder()
+
+    def Fill(self):
+        chunk = self.file.read(self.chunkSize)
+        self.buffer, self.pos = self.buffer[self.pos:] + chunk, 0
+        self.isEOF = not chunk
+
+    # Skip whitespaces and return the next character ('' at the end of file):
+    def Peek(self):
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in self.WHITESPACE:
+                pos += 1
+
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+
+            if self.isEOF:
+                return ''
+
+            self.Fill()
+
+    # Consume the next character, which must be one of [chars]:
+    def Expect(self, chars):
+        if (char := self.Peek()) == '' or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {list(chars)}", self.buffer, self.pos)
+
+        self.pos += 1
+        return char
+
+    # Decode the next complete value:
+    def Decode(self):
+        while True:
+            self.Peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+
+                # A number at the end of the buffer may continue in the next chunk:
+                if self.isEOF or (end < len(self.buffer) and self.buffer[end] not in self.NUMBERCHARS):
+                    self.pos = end
+                    return value
+
+            except json.JSONDecodeError:
+                if self.isEOF:
+                    raise
+
+            self.Fill()
+
+
+class ArrayBuffer:
+    """
+    A numpy array which grows by doubling its capacity when rows are appended.
+    """
+    def __init__(self, rowShape=(), dtype=np.float64, capacity=64):
+        self.data = np.empty((capacity, *rowShape), dtype=dtype)
+        self.size = 0
+
+    def Append(self, row):
+        if self.size == len(self.data):
+            self.data = np.concatenate([self.data, np.empty_like(self.data)])
+
+        self.data[self.size] = row
+        self.size += 1
+
+    @property
+    def array(self):
+        return self.data[:self.size]
+
+
+# Iterate over a top-level JSON object. Elements of list values are yielded one by one as (key, element, True), and other values as (key, value, False):
+def IterJSONItems(path, chunkSize=1 << 20):
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = JSONStream(f, chunkSize)
+        stream.Expect('{')
+        if stream.Peek() == '}':
+            return
+
+        while True:
+            key = stream.Decode()
+            stream.Expect(':')
+            if stream.Peek() == '[':
+                stream.Expect('[')
+                if stream.Peek() == ']':
+                    stream.Expect(']')
+                else:
+                    while True:
+                        yield key, stream.Decode(), True
+                        if stream.Expect(',]') == ']': break
+            else:
+                yield key, stream.Decode(), False
+
+            if stream.Expect(',}') == '}': break
@@ -1,22 +1,25 @@
 import numpy as np
 import json
 import copy
+import os
+from itertools import chain
 from pprint import pformat
 
-from .utils import IsZero, IsZeroVector, GetLength, CheckDim, DimensionError, TrussNotStableError, InvaildJointError, TrussNotSolvedError, NotAllBeSetError
-from .type  import MemberType, SupportType
+from .utils import IsZero, IsZeroVector, GetLength, CheckDim, DimensionError, TrussNotStableError, InvaildJointError, TrussNotSolvedError, NotAllBeSetError, InvalidSupportTypeError
+from .type  import MemberType, SupportType, MEMBER_TYPES
+from .stream import ArrayBuffer, IterJSONItems
 
 
 class Member:
-    def __init__(self, joint0, joint1, dim=3, memberType=MemberType()):
+    def __init__(self, joint0, joint1, dim=3, memberType=MemberType(), length=None):
         self.__dim = CheckDim(dim)
         if len(joint0) != dim or len(joint1) != dim:
             raise DimensionError(f"Dimension of each joint must be {dim}, but got dim(joint0) = {len(joint0)} and dim(joint1) = {len(joint1)}.")
         
         self.__joint0     = joint0
         self.__joint1     = joint1
-        self.__memberType = memberType
-        self.__length     = sum((joint1[i] - joint0[i]) ** 2. for i in range(dim)) ** 0.5
+        self.__memberType = MEMBER_TYPES.Intern(memberType)     # (FrozenMemberType) Shared by all members with the same type
+        self.__length     = sum((joint1[i] - joint0[i]) ** 2. for i in range(dim)) ** 0.5 if length is None else length
     
     def __repr__(self):
         return f"Member[{self.__joint0}, {self.__joint1}, k={self.e * self.a / self.__length :.4f}]"
@@ -39,11 +42,15 @@ class Member:
 
     @property
     def memberType(self):
-        return self.__memberType.Copy()
+        return self.__memberType
     
     @memberType.setter
     def memberType(self, other):
-        self.__memberType.Set(other)
+        self.__memberType = MEMBER_TYPES.Intern(other)
+    
+    @property
+    def typeCode(self):
+        return self.__memberType.code
     
     @property
     def length(self):
@@ -103,7 +110,7 @@ class Member:
     
     # Copy this member:
     def Copy(self):
-        return Member(tuple([v for v in self.__joint0]), tuple([v for v in self.__joint1]), self.__dim, self.memberType.Copy())
+        return Member(tuple([v for v in self.__joint0]), tuple([v for v in self.__joint1]), self.__dim, self.__memberType)
 
 
 class Truss:
@@ -185,6 +192,79 @@ class Truss:
         self.__members[len(self.__members)] = (jointID0, jointID1, Member(self.__joints[jointID0][0], 
                                                                           self.__joints[jointID1][0],
                                                                           self.__dim, memberType))
+
+    # Build a truss from arrays in bulk:
+    @classmethod
+    def FromArrays(cls, coords, supports=None, connectivity=None, areas=1., moduli=1., densities=1., forces=None):
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2:
+            raise DimensionError(f"[coords] must be an array with shape (nJoint, dim), but got shape {coords.shape}.")
+        
+        nJoint, dim  = coords.shape
+        supports     = np.full([nJoint], SupportType.NO) if supports     is None else supports
+        connectivity = np.zeros([0, 2], dtype=np.int64)  if connectivity is None else np.asarray(connectivity, dtype=np.int64).reshape(-1, 2)
+        memberTypes  = np.empty([len(connectivity), 3])
+        memberTypes[:, 0], memberTypes[:, 1], memberTypes[:, 2] = areas, moduli, densities
+
+        if forces is None:
+            forceIDs, forceVectors = np.zeros([0], dtype=np.int64), np.zeros([0, dim])
+        else:
+            forceVectors = np.asarray(forces, dtype=np.float64)
+            if forceVectors.shape != coords.shape:
+                raise DimensionError(f"[forces] must be an array with shape {coords.shape}, but got shape {forceVectors.shape}.")
+            
+            forceIDs = np.arange(nJoint)
+
+        return cls(dim).__AddArrays(coords, supports, connectivity, memberTypes, forceIDs, forceVectors)
+    
+    # Add joints, forces and members in bulk (IDs of new joints and members follow the existing ones):
+    def __AddArrays(self, coords, supports, connects, memberTypes, forceIDs, forceVectors):
+        dim, nJointOld, nMemberOld = self.__dim, len(self.__joints), len(self.__members)
+        coords       = np.asarray(coords      , dtype=np.float64)
+        supports     = np.asarray(supports    , dtype=np.int64  )
+        connects     = np.asarray(connects    , dtype=np.int64  )
+        memberTypes  = np.asarray(memberTypes , dtype=np.float64)
+        forceIDs     = np.asarray(forceIDs    , dtype=np.int64  )
+        forceVectors = np.asarray(forceVectors, dtype=np.float64)
+        nJoint       = nJointOld + len(coords)
+
+        # Validate in bulk:
+        if coords.shape != (len(coords), dim) or forceVectors.shape != (len(forceIDs), dim):
+            raise DimensionError(f"Dimension of each joint and force must be {dim}, but got shape {coords.shape} and {forceVectors.shape}.")
+        
+        if supports.shape != (len(coords),) or connects.shape != (len(connects), 2) or memberTypes.shape != (len(connects), 3):
+            raise ValueError(f"Shapes of arrays are not consistent: supports {supports.shape}, connectivity {connects.shape}, member types {memberTypes.shape}.")
+        
+        validSupports = [SupportType.NO, SupportType.PIN, SupportType.ROLLER_X, SupportType.ROLLER_Y] + ([SupportType.ROLLER_Z] if dim == 3 else [])
+        if not np.isin(supports, validSupports).all():
+            raise InvalidSupportTypeError(f"No such {dim}D-support type {sorted(set(supports.tolist()) - set(validSupports))} !")
+        
+        if len(connects) and (connects.min() < 0 or connects.max() >= nJoint):
+            raise InvaildJointError(f"No such joint [{connects.min() if connects.min() < 0 else connects.max()}], can't add member on it.")
+        
+        if len(forceIDs) and (forceIDs.min() < 0 or forceIDs.max() >= nJoint):
+            raise InvaildJointError(f"No such joint [{forceIDs.min() if forceIDs.min() < 0 else forceIDs.max()}], can't add force on it.")
+
+        # Joints:
+        joints = self.__joints
+        for jointID, position, supportType in zip(range(nJointOld, nJoint), map(tuple, coords.tolist()), supports.tolist()):
+            joints[jointID] = (position, supportType)
+        
+        # Forces:
+        isForced = np.logical_not(IsZero(forceVectors).all(axis=1))
+        for jointID, vector in zip(forceIDs[isForced].tolist(), map(tuple, forceVectors[isForced].tolist())):
+            self.__forces[jointID] = vector
+        
+        # Members:
+        members   = self.__members
+        positions = np.array([joints[jointID][0] for jointID in range(nJoint)], dtype=np.float64).reshape(nJoint, dim)
+        lengths   = np.sqrt(((positions[connects[:, 1]] - positions[connects[:, 0]]) ** 2.).sum(axis=1))
+        types     = [MEMBER_TYPES[code] for code in MEMBER_TYPES.GetCodes(memberTypes).tolist()]
+        for memberID, (jointID0, jointID1), memberType, length in zip(range(nMemberOld, nMemberOld + len(connects)), connects.tolist(), types, lengths.tolist()):
+            members[memberID] = (jointID0, jointID1, Member(joints[jointID0][0], joints[jointID1][0], dim, memberType, length))
+
+        return self
+
     def SetJointPosition(self, jointID, position):
         self.__joints[jointID] = (position, self.__joints[jointID][-1])
         for jointID0, jointID1, member in self.__members.values():
@@ -297,11 +377,38 @@ class Truss:
         return [memberID for memberID in self.__members]
     
     def GetUsedMemberTypes(self):
-        return set([member.memberType for _, _, member in self.__members.values()])
+        return set(MEMBER_TYPES[code] for code in np.unique(self.GetMemberTypeCodes()).tolist())
+    
+    # Get the code of each member type in [MEMBER_TYPES] with shape (nMember,):
+    def GetMemberTypeCodes(self):
+        return np.fromiter((member.typeCode for _, _, member in self.__members.values()), dtype=np.int64, count=len(self.__members))
+    
+    # Get (a, e, density) of each member with shape (nMember, 3):
+    def GetMemberTypeArray(self):
+        return MEMBER_TYPES.array[self.GetMemberTypeCodes()]
+    
+    # Get positions with shape (nJoint, dim) and support types with shape (nJoint) in the order of joint IDs:
+    def GetJointArrays(self):
+        dim, joints = self.__dim, self.__joints
+        positions = np.fromiter(chain.from_iterable(position for position, _ in joints.values()), dtype=np.float64, count=len(joints) * dim).reshape(-1, dim)
+        supports  = np.fromiter((supportType for _, supportType in joints.values()), dtype=np.int8, count=len(joints))
+        return positions, supports
+    
+    # Get joint IDs of each member with shape (nMember, 2):
+    def GetConnectArray(self):
+        members = self.__members
+        return np.fromiter(chain.from_iterable((jointID0, jointID1) for jointID0, jointID1, _ in members.values()), dtype=np.int64, count=len(members) * 2).reshape(-1, 2)
     
     # Get the full dimension vector of external forces padding by 0:
-    def GetExternalForceVector(self):
-        return np.array([self.__forces.get(i, np.zeros([self.__dim])) for i in range(self.nJoint)]).ravel()
+    def GetExternalForceVector(self, forces=None):
+        forces, dim, nJoint = self.__forces if forces is None else forces, self.__dim, self.nJoint
+        vector = np.zeros([nJoint, dim])
+        if forces:
+            jointIDs  = np.fromiter(forces.keys(), dtype=np.int64, count=len(forces))
+            isInRange = jointIDs < nJoint
+            vector[jointIDs[isInRange]] = np.array(list(forces.values()), dtype=float).reshape(-1, dim)[isInRange]
+
+        return vector.ravel()
         
     # Get the structural matrix K:
     def GetKMatrix(self):
@@ -325,8 +432,32 @@ class Truss:
         
         return displaceUnknownMask
         
-    # Solve the linear system => K * u = f:
-    def Solve(self):
+    # Solve the linear system => K * u = f (Results are read from / written into [cache] if a SolveCache is given):
+    def Solve(self, cache=None):
+        key     = cache.GetKey(self) if cache is not None else None
+        results = cache.Get(self, key) if cache is not None else None
+        if results is None:
+            results = self.__SolveForceMatrix(self.GetExternalForceVector().reshape(-1, 1))[0]
+            if cache is not None:
+                cache.Put(self, results, key)
+
+        self.__displace, self.__external, self.__internal = results
+
+        # Return results:
+        self.__isSolved = True
+    
+    # Solve several load cases with only one factorization of K => K * U = F (Results of this truss won't be changed):
+    def SolveLoadCases(self, forcesList):
+        for forces in forcesList:
+            for jointID in forces:
+                if jointID not in self.__joints:
+                    raise InvaildJointError(f"No such joint [{jointID}], can't add force on it.")
+
+        matF = np.stack([self.GetExternalForceVector(forces) for forces in forcesList], axis=1)
+        return self.__SolveForceMatrix(matF)
+    
+    # Solve displacements, external forces and internal forces for every column of the force matrix:
+    def __SolveForceMatrix(self, matF):
 
         # Check whether this truss is stable or not:
         if not self.isStable:
@@ -335,33 +466,33 @@ class Truss:
         # Get linear system:
         dim  = self.__dim
         matK = self.GetKMatrix()
-        vecF = self.GetExternalForceVector()
         mask = self.GetDisplacementUnknownMask()
 
         # Solve displacements:
-        vecD = np.zeros([self.nJoint * dim])
-        vecD[mask] = np.linalg.solve(matK[mask, :][:, mask], vecF[mask])
-        self.__displace = {jointID: d for jointID in self.__joints 
-                           if not IsZeroVector(d := vecD[jointID * dim: (jointID + 1) * dim])}
-        
+        matD = np.zeros_like(matF)
+        matD[mask] = np.linalg.solve(matK[mask, :][:, mask], matF[mask])
+
         # Solve resistances:
         mask = np.logical_not(mask)
-        vecF[mask] = (matK[mask, :] @ (vecD.reshape(-1, 1))).ravel()
-        self.__external = {jointID: f for jointID in self.__joints
-                           if not IsZeroVector(f := vecF[jointID * dim: (jointID + 1) * dim])}
-        
+        matF[mask] = matK[mask, :] @ matD
+
         # Solve all the internal forces:
-        internal = {}
-        for memberID, (jointID0, jointID1, member) in self.__members.items():
+        matI = np.zeros([len(self.__members), matF.shape[1]])
+        for i, (jointID0, jointID1, member) in enumerate(self.__members.values()):
             index = list(range(jointID0 * dim, (jointID0 + 1) * dim)) + list(range(jointID1 * dim, (jointID1 + 1) * dim))
-            vecI  = (member.matK[dim:] @ vecD[index].reshape(-1, 1)).ravel()
-            if not IsZero(valI := (1. if member.IsTension(vecI) else -1.) * GetLength(vecI)):
-                internal[memberID] = valI
-        
-        self.__internal = internal
+            vecIs = member.matK[dim:] @ matD[index]
+            matI[i] = [(1. if member.IsTension(vecI) else -1.) * GetLength(vecI) for vecI in vecIs.T]
+
+        results = []
+        for vecD, vecF, vecI in zip(matD.T, matF.T, matI.T):
+            displace = {jointID: d for jointID in self.__joints 
+                        if not IsZeroVector(d := vecD[jointID * dim: (jointID + 1) * dim])}
+            external = {jointID: f for jointID in self.__joints
+                        if not IsZeroVector(f := vecF[jointID * dim: (jointID + 1) * dim])}
+            internal = {memberID: valI for memberID, valI in zip(self.__members, vecI.tolist()) if not IsZero(valI)}
+            results.append((displace, external, internal))
         
-        # Return results:
-        self.__isSolved = True
+        return results
     
     # Serialize this truss:
     def Serialize(self):
@@ -398,19 +529,25 @@ class Truss:
         return data
     
     # Load truss data from a .json file:
-    def LoadFromJSON(self, path=None, isOutputFile=False, data=None):
+    def LoadFromJSON(self, path=None, isOutputFile=False, data=None, isStream=False):
+        if data is None and isStream:
+            return self.__LoadFromJSONStream(path, isOutputFile)
+
         if data is None:
             with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
         
-        for vector, supportType in data['joint']:
-            self.AddNewJoint(vector, SupportType.GetFromString(supportType))
-        
-        for jointID, vector in data['force']:
-            self.AddExternalForce(jointID, vector)
-        
-        for [jointID0, jointID1], memberType in data['member']:
-            self.AddNewMember(jointID0, jointID1, MemberType(*memberType))
+        dim, supportTypes = self.__dim, {}
+        for _, supportType in data['joint']:
+            if supportType not in supportTypes:
+                supportTypes[supportType] = SupportType.GetFromString(supportType)
+
+        self.__AddArrays(np.array([vector[:dim] for vector, _ in data['joint']], dtype=np.float64).reshape(-1, dim),
+                         [supportTypes[supportType] for _, supportType in data['joint']],
+                         np.array([connect for connect, _ in data['member']], dtype=np.int64).reshape(-1, 2),
+                         np.array([memberType for _, memberType in data['member']], dtype=np.float64).reshape(-1, 3),
+                         [jointID for jointID, _ in data['force']],
+                         np.array([vector[:dim] for _, vector in data['force']], dtype=np.float64).reshape(-1, dim))
 
         if isOutputFile:
             self.__isSolved = True
@@ -420,23 +557,176 @@ class Truss:
         
         return self
  
+    # Load truss data from a .json file incrementally into compact numpy buffers (without building the whole JSON object tree):
+    def __LoadFromJSONStream(self, path, isOutputFile):
+        dim, supportTypes = self.__dim, {}
+        coords    , supports    = ArrayBuffer((dim,)), ArrayBuffer((), np.int8)
+        forceIDs  , forces      = ArrayBuffer((), np.int64), ArrayBuffer((dim,))
+        connects  , memberTypes = ArrayBuffer((2,), np.int64), ArrayBuffer((3,))
+        displaceIDs, displaces  = ArrayBuffer((), np.int64), ArrayBuffer((dim,))
+        externalIDs, externals  = ArrayBuffer((), np.int64), ArrayBuffer((dim,))
+        internalIDs, internals  = ArrayBuffer((), np.int64), ArrayBuffer(())
+
+        for key, item, _ in IterJSONItems(path):
+            if key == 'joint':
+                vector, supportType = item
+                if supportType not in supportTypes:
+                    supportTypes[supportType] = SupportType.GetFromString(supportType)
+
+                coords  .Append(vector[:dim])
+                supports.Append(supportTypes[supportType])
+            elif key == 'force':
+                forceIDs.Append(item[0])
+                forces  .Append(item[1][:dim])
+            elif key == 'member':
+                connects   .Append(item[0])
+                memberTypes.Append(item[1])
+            elif isOutputFile and key == 'displace':
+                displaceIDs.Append(item[0])
+                displaces  .Append(item[1])
+            elif isOutputFile and key == 'external':
+                externalIDs.Append(item[0])
+                externals  .Append(item[1])
+            elif isOutputFile and key == 'internal':
+                internalIDs.Append(item[0])
+                internals  .Append(item[1])
+
+        self.__AddArrays(coords.array, supports.array, connects.array, memberTypes.array, forceIDs.array, forces.array)
+
+        if isOutputFile:
+            self.__isSolved = True
+            self.__displace = dict(zip(displaceIDs.array.tolist(), displaces.array.copy()))
+            self.__external = dict(zip(externalIDs.array.tolist(), externals.array.copy()))
+            self.__internal = dict(zip(internalIDs.array.tolist(), internals.array.tolist()))
+
+        return self
+
     # Dump all the structural analysis results into a .json file:
-    def DumpIntoJSON(self, path):
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(self.Serialize(), f, ensure_ascii=False)
-    
-    # Check whether all internal forces are in allowable range or not:
-    def IsInternalStressAllowed(self, limit, isGetSumViolation=False, isGetSumNonViolation=False):
+    def DumpIntoJSON(self, path, isFast=False):
+        if not isFast:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.Serialize(), f, ensure_ascii=False)
+        
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                for i, (key, fmt, columns) in enumerate(self.__GetColumns()):
+                    f.write(('{' if i == 0 else ', ') + f'"{key}": ')
+                    f.write(self.__FormatRows(fmt, columns) if columns else json.dumps(fmt))
+                
+                f.write('}')
+    
+    @staticmethod
+    def __ToList(column):
+        return column.tolist() if isinstance(column, np.ndarray) else column
+    
+    # Format rows of columns into a JSON list with only one string formatting (The same text as [json.dump]):
+    @staticmethod
+    def __FormatRows(fmt, columns):
+        rows = zip(*[Truss.__ToList(column) for column in columns])
+        if not all(np.isfinite(column).all() for column in columns if isinstance(column, np.ndarray)):
+            return json.dumps([list(row) for row in rows])
+
+        values = chain.from_iterable(chain.from_iterable((v if isinstance(v, list) else (v,)) for v in row) for row in rows)
+        return '[' + ', '.join([fmt] * len(columns[0])) % tuple(values) + ']'
+
+    # Get (key, row format, columns) of each list in the serialized truss ([weight] has no columns and its value is in place of the format):
+    def __GetColumns(self):
+        dim, joints, members, forces = self.__dim, self.__joints, self.__members, self.__forces
+        vecFmt = '[' + ', '.join(['%r'] * dim) + ']'
+        names  = {supportType: json.dumps(SupportType.GetFromType(supportType), ensure_ascii=False) for supportType in set(supportType for _, supportType in joints.values())}
+
+        columns = [
+            ('joint' , f"[{vecFmt}, %s]"         , (np.array([position for position, _ in joints.values()]).reshape(-1, dim),
+                                                    [names[supportType] for _, supportType in joints.values()])),
+            ('force' , f"[%d, {vecFmt}]"         , (list(forces.keys()), np.array(list(forces.values())).reshape(-1, dim))),
+            ('member', "[[%d, %d], [%r, %r, %r]]", (np.array([(jointID0, jointID1) for jointID0, jointID1, _ in members.values()], dtype=np.int64).reshape(-1, 2),
+                                                    np.array([member.memberType.Serialize() for _, _, member in members.values()]).reshape(-1, 3)))
+        ]
+
         if self.__isSolved:
+            columns += [
+                ('displace', f"[%d, {vecFmt}]", (list(self.__displace.keys()), np.array(list(self.__displace.values())).reshape(-1, dim))),
+                ('external', f"[%d, {vecFmt}]", (list(self.__external.keys()), np.array(list(self.__external.values())).reshape(-1, dim))),
+                ('internal', "[%d, %r]"       , (list(self.__internal.keys()), np.array(list(self.__internal.values()), dtype=np.float64))),
+                ('weight'  , float(self.weight), None)
+            ]
+
+        return columns
+    
+    # Dump the truss (and the results if solved) into a folder of typed .npy arrays:
+    def DumpIntoBinary(self, path):
+        dim, nJoint, nMember = self.__dim, self.nJoint, self.nMember
+        joints, members      = self.__joints, self.__members
+        arrays = {
+            'dim'       : np.array(dim, dtype=np.int64),
+            'joint'     : np.array([joints[jointID][0] for jointID in range(nJoint)], dtype=np.float64).reshape(nJoint, dim),
+            'support'   : np.array([joints[jointID][1] for jointID in range(nJoint)], dtype=np.int8),
+            'member'    : np.array([members[memberID][:2] for memberID in range(nMember)], dtype=np.int64).reshape(nMember, 2),
+            'memberType': self.GetMemberTypeArray(),
+            'forceJoint': np.array(list(self.__forces.keys()), dtype=np.int64),
+            'force'     : np.array(list(self.__forces.values()), dtype=np.float64).reshape(self.nForce, dim)
+        }
+
+        if self.__isSolved:
+            arrays['displace'] = np.zeros([nJoint, dim])
+            arrays['external'] = np.zeros([nJoint, dim])
+            arrays['internal'] = np.zeros([nMember])
+            arrays['weight'  ] = np.array(self.weight)
+            for jointID , vector in self.__displace.items(): arrays['displace'][jointID ] = vector
+            for jointID , vector in self.__external.items(): arrays['external'][jointID ] = vector
+            for memberID, force  in self.__internal.items(): arrays['internal'][memberID] = force
+
+        os.makedirs(path, exist_ok=True)
+        for key in ('displace', 'external', 'internal', 'weight'):
+            if key not in arrays and os.path.exists(keyPath := os.path.join(path, f"{key}.npy")):
+                os.remove(keyPath)
+
+        for key, array in arrays.items():
+            np.save(os.path.join(path, f"{key}.npy"), array)
+
+    # Open the arrays in a folder dumped by [Truss.DumpIntoBinary] as read-only memory maps (Nothing is read until it's used):
+    @staticmethod
+    def OpenBinary(path):
+        arrays = {}
+        for key in ('dim', 'joint', 'support', 'member', 'memberType', 'forceJoint', 'force', 'displace', 'external', 'internal', 'weight'):
+            if os.path.exists(keyPath := os.path.join(path, f"{key}.npy")):
+                arrays[key] = np.load(keyPath, mmap_mode='r')
+
+        return arrays
+
+    # Load truss data from a folder dumped by [Truss.DumpIntoBinary]:
+    def LoadFromBinary(self, path, isOutputFile=False):
+        arrays = self.OpenBinary(path)
+        if int(arrays['dim']) != self.__dim:
+            raise DimensionError(f"Dimension of the truss is {self.__dim}, but got {int(arrays['dim'])} in [{path}].")
+
+        if isOutputFile and (missing := [key for key in ('displace', 'external', 'internal') if key not in arrays]):
+            raise TrussNotSolvedError(f"[{path}] was dumped before structural analysis (no {', '.join(missing)}), load it with isOutputFile=False.")
+
+        self.__AddArrays(arrays['joint'], arrays['support'], arrays['member'], arrays['memberType'], arrays['forceJoint'], arrays['force'])
+
+        if isOutputFile:
+            dim, displace, external, internal = self.__dim, np.array(arrays['displace']), np.array(arrays['external']), np.array(arrays['internal'])
+            self.__isSolved = True
+            self.__displace = {jointID : d                      for jointID  in range(self.nJoint ) if not IsZeroVector(d := displace[jointID])}
+            self.__external = {jointID : f                      for jointID  in range(self.nJoint ) if not IsZeroVector(f := external[jointID])}
+            self.__internal = {memberID: float(internal[memberID]) for memberID in range(self.nMember) if internal[memberID] != 0.}
+
+        return self
+
+    # Check whether all internal forces are in allowable range or not:
+    def IsInternalStressAllowed(self, limit, isGetSumViolation=False, isGetSumNonViolation=False, internals=None):
+        if self.__isSolved or internals is not None:
+            internals = self.__internal if internals is None else internals
             if isGetSumViolation:
-                violation = sum(f - limit for memberID, force in self.__internal.items() if (f := abs(force) / self.__members[memberID][2].a) > limit)
+                violation = sum(f - limit for memberID, force in internals.items() if (f := abs(force) / self.__members[memberID][2].a) > limit)
                 isVio     = IsZero(violation)
             else:
-                violation = {memberID: f - limit for memberID, force in self.__internal.items() if (f := abs(force) / self.__members[memberID][2].a) > limit}
+                violation = {memberID: f - limit for memberID, force in internals.items() if (f := abs(force) / self.__members[memberID][2].a) > limit}
                 isVio     = len(violation) == 0
             
             if isGetSumNonViolation:
-                nonViolation = sum(limit - f for memberID, force in self.__internal.items() if (f := abs(force) / self.__members[memberID][2].a) <= limit)
+                nonViolation = sum(limit - f for memberID, force in internals.items() if (f := abs(force) / self.__members[memberID][2].a) <= limit)
                 return isVio, violation, nonViolation
             
             return isVio, violation
@@ -444,17 +734,18 @@ class Truss:
         raise TrussNotSolvedError("Haven't done structural analysis yet.")
     
     # Check whether all internal displacements are in allowable range or not:
-    def IsDisplacementAllowed(self, limit, isGetSumViolation=False, isGetSumNonViolation=False):
-        if self.__isSolved:
+    def IsDisplacementAllowed(self, limit, isGetSumViolation=False, isGetSumNonViolation=False, displaces=None):
+        if self.__isSolved or displaces is not None:
+            displaces = self.__displace if displaces is None else displaces
             if isGetSumViolation:
-                violation = sum(l - limit for displace in self.__displace.values() if (l := GetLength(displace)) > limit)
+                violation = sum(l - limit for displace in displaces.values() if (l := GetLength(displace)) > limit)
                 isVio     = IsZero(violation)
             else:
-                violation = {jointID: l - limit for jointID, displace in self.__displace.items() if (l := GetLength(displace)) > limit}
+                violation = {jointID: l - limit for jointID, displace in displaces.items() if (l := GetLength(displace)) > limit}
                 isVio     = len(violation) == 0
             
             if isGetSumNonViolation:
-                nonViolation = sum(limit - l for displace in self.__displace.values() if (l := GetLength(displace)) <= limit)
+                nonViolation = sum(limit - l for displace in displaces.values() if (l := GetLength(displace)) <= limit)
                 return isVio, violation, nonViolation
             
             return isVio, violation
@@ -27,6 +27,148 @@ class MemberType:
         return MemberType(self.a, self.e, self.density)
 
 
+class FrozenMemberType(MemberType):
+    """
+    An immutable member type interned in a [MemberTypeCatalog]. All members with the same (a, e, density) share one
+    object, and its [code] indexes the property array of the catalog. Use [Copy] to get a mutable MemberType.
+    """
+    def __init__(self, a, e, density, code):
+        object.__setattr__(self, 'a'      , float(a))
+        object.__setattr__(self, 'e'      , float(e))
+        object.__setattr__(self, 'density', float(density))
+        object.__setattr__(self, 'code'   , code)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Member types in the catalog are immutable, use Copy() to get a mutable one.")
+
+    def __reduce__(self):
+        # Re-intern in the receiving process (Codes are only meaningful in the process which created them):
+        return InternMemberType, ((self.a, self.e, self.density),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def Set(self, other):
+        raise AttributeError("Member types in the catalog are immutable, use Copy() to get a mutable one.")
+
+
+class MemberTypeCatalog:
+    """
+    An append-only registry which interns member types, so each distinct (a, e, density) is stored once and is referred
+    to by a small integer code. Properties of all types are kept in one (nType, 3) array, so per-member lookups become
+    array indexing. Types interned inside a [Scope] are dropped when it exits, which keeps the catalog bounded when member
+    types are continuous (e.g. random areas of each truss in a dataset).
+    """
+    def __init__(self):
+        self.__codes  = {}                                  # (dict) {(a, e, density): code}
+        self.__types  = []                                  # (list) [FrozenMemberType]
+        self.__buffer = np.zeros([16, 3], dtype=np.float64) # (np.ndarray) Properties of all types (Capacity grows by doubling)
+        self.__array  = None                                # (np.ndarray) Read-only view of the first nType rows of [__buffer]
+
+    def __len__(self):
+        return len(self.__types)
+
+    def __getitem__(self, code):
+        return self.__types[code]
+
+    # Get the interned type of a MemberType or a sequence [a, e, density]:
+    def Intern(self, memberType):
+        if isinstance(memberType, FrozenMemberType) and memberType.code < len(self.__types) and self.__types[memberType.code] is memberType:
+            return memberType
+
+        key  = (float(memberType.a), float(memberType.e), float(memberType.density)) if isinstance(memberType, MemberType) else tuple(map(float, memberType))
+        code = self.__codes.get(key)
+        if code is None:
+            code = self.__codes[key] = len(self.__types)
+            self.__types.append(FrozenMemberType(*key, code))
+            if code == len(self.__buffer):
+                self.__buffer = np.concatenate([self.__buffer, np.zeros_like(self.__buffer)])
+
+            self.__buffer[code] = key
+            self.__array = None
+
+        return self.__types[code]
+
+    def GetCode(self, memberType):
+        return self.Intern(memberType).code
+
+    # Get the codes of an array of member types with shape (n, 3) (Only distinct rows are interned one by one):
+    def GetCodes(self, memberTypes):
+        memberTypes = np.asarray(memberTypes, dtype=np.float64).reshape(-1, 3)
+        if len(memberTypes) == 0:
+            return np.zeros([0], dtype=np.int64)
+
+        uniqueTypes, inverse = np.unique(memberTypes, axis=0, return_inverse=True)
+        return np.array([self.GetCode(row) for row in uniqueTypes.tolist()], dtype=np.int64)[inverse.reshape(-1)]
+
+    # Get the properties of all types as a read-only array with shape (nType, 3):
+    @property
+    def array(self):
+        if self.__array is None:
+            self.__array = self.__buffer[:len(self.__types)]
+            self.__array.flags.writeable = False
+
+        return self.__array
+
+    # Drop all types whose codes are not less than [nType]:
+    def Truncate(self, nType):
+        for memberType in self.__types[nType:]:
+            del self.__codes[(memberType.a, memberType.e, memberType.density)]
+
+        del self.__types[nType:]
+        self.__array = None
+
+    # Get a context manager which drops the types interned inside it on exit. Trusses (and codes) which use those types
+    # must not be used after the scope exits, since their codes may be given to other types later:
+    def Scope(self):
+        return MemberTypeScope(self)
+
+    # Get the index of each code in [memberTypes] (e.g. the classes of a model), raise ValueError if any type isn't in it:
+    def GetIndexes(self, codes, memberTypes):
+        codes   = np.asarray(codes, dtype=np.int64)
+        lookup  = np.full([len(self) + len(memberTypes)], -1, dtype=np.int64)
+        typeCodes = [self.GetCode(memberType) for memberType in memberTypes]
+        lookup[typeCodes[::-1]] = np.arange(len(memberTypes) - 1, -1, -1)
+        indexes = lookup[codes]
+
+        # Fall back to comparing with tolerance (See [MemberType.__eq__]) for types which aren't exactly in [memberTypes]:
+        for i in np.flatnonzero(indexes < 0).tolist():
+            indexes[i] = list(memberTypes).index(self.__types[codes[i]])
+
+        return indexes
+
+
+class MemberTypeScope:
+    """
+    Remember the number of types in a [MemberTypeCatalog] on enter, and truncate the catalog back to it on exit.
+
+    Usage:
+        with MEMBER_TYPES.Scope():
+            truss = Truss.FromArrays(coords, supports, connectivity, randomAreas, moduli, densities, forces)
+            ...
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.nType   = None
+
+    def __enter__(self):
+        self.nType = len(self.catalog)
+        return self.catalog
+
+    def __exit__(self, *args):
+        self.catalog.Truncate(self.nType)
+
+
+# Catalog shared by all trusses in this process:
+MEMBER_TYPES = MemberTypeCatalog()
+
+def InternMemberType(memberType):
+    return MEMBER_TYPES.Intern(memberType)
+
+
 class SupportType:
     NO       = 0
     PIN      = 1
@@ -108,4 +250,11 @@ class LinkType:
 class GenerateMethod:
     DFS    = 0
     BFS    = 1
-    Random = 2
\ No newline at end of file
+    Random = 2
+
+
+class GenerateOutput:
+    TRUSS  = 0
+    JSON   = 1
+    ARRAYS = 2
+    PATH   = 3
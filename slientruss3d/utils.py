@@ -1,7 +1,4 @@
-from turtle import position
 import numpy as np
-from matplotlib.patches import FancyArrowPatch
-from mpl_toolkits.mplot3d import proj3d
 
 
 # ----------------------------- Constant -----------------------------
@@ -9,43 +6,13 @@ INF = float("inf")
 
 
 # ----------------------------- Plot -----------------------------
-class Arrow3D(FancyArrowPatch):
-    def __init__(self, posA, posB, *args, **kwargs):
-        super().__init__((0,0), (0,0), *args, **kwargs)
-        self._verts3d =  list(zip(posA, posB))
+# Plot helpers live in [slientruss3d.plot], so importing the solver core doesn't import matplotlib:
+def __getattr__(name):
+    if name in ('Arrow3D', 'Arrow2D', 'SetAxesEqual'):
+        from . import plot
+        return getattr(plot, name)
 
-    def do_3d_projection(self, renderer=None):
-        xs3d, ys3d, zs3d = self._verts3d
-        xs, ys, zs = proj3d.proj_transform(xs3d, ys3d, zs3d, self.axes.M)
-        self.set_positions((xs[0],ys[0]),(xs[1],ys[1]))
-        return np.min(zs)
-
-
-class Arrow2D(FancyArrowPatch):
-    pass
-
-
-def SetAxesEqual(ax, dim):
-    if dim == 3:
-        xLimits = ax.get_xlim3d()
-        yLimits = ax.get_ylim3d()
-        zLimits = ax.get_zlim3d()
-
-        xRange = abs(xLimits[1] - xLimits[0])
-        yRange = abs(yLimits[1] - yLimits[0])
-        zRange = abs(zLimits[1] - zLimits[0])
-
-        xMiddle = np.mean(xLimits)
-        yMiddle = np.mean(yLimits)
-        zMiddle = np.mean(zLimits)
-
-        plotRadius = 0.5*max([xRange, yRange, zRange])
-
-        ax.set_xlim3d([xMiddle - plotRadius, xMiddle + plotRadius])
-        ax.set_ylim3d([yMiddle - plotRadius, yMiddle + plotRadius])
-        ax.set_zlim3d([zMiddle - plotRadius, zMiddle + plotRadius])
-    else:
-        ax.set_aspect('equal')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ----------------------------- Exception -----------------------------
@@ -1,5 +1,10 @@
+import os
 import json
+import tarfile
+import argparse
+from itertools import islice
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 
 def ForJSONFile(srcFile, dstFile=None):
@@ -36,4 +41,241 @@ def ForJSONFile(srcFile, dstFile=None):
         with open(dstFile, 'w', encoding='utf-8') as f:
             json.dump(newData, f)
     
-    return newData
\ No newline at end of file
+    return newData
+
+
+# Iterate over (key, items) of the v2 format lazily, without building the converted object:
+def IterV2Items(originData):
+    yield "joint" , iter(originData["joint"].values())
+    yield "force" , ([int(jointID), vector] for jointID, vector in originData["force"].items())
+    yield "member", iter(originData["member"].values())
+
+    for key in ("displace", "external", "internal"):
+        if key in originData:
+            yield key, ([int(ID), value] for ID, value in originData[key].items())
+
+    if "weight" in originData:
+        yield "weight", originData["weight"]
+
+
+# Cheap structural check of one item in the v2 format:
+def CheckV2Item(key, item, nJoint, nMember):
+    if key == "joint":
+        isValid = len(item) == 2 and len(item[0]) in (2, 3) and isinstance(item[1], str)
+    elif key == "member":
+        isValid = len(item) == 2 and len(item[1]) == 3 and all(0 <= jointID < nJoint for jointID in item[0])
+    elif key == "internal":
+        isValid = 0 <= item[0] < nMember
+    else:
+        isValid = 0 <= item[0] < nJoint and len(item[1]) in (2, 3)
+
+    if not isValid:
+        raise ValueError(f"Invalid item in [{key}]: {item}")
+
+
+# Convert v1 data and stream it into a .json file in the v2 format (The output is checked item by item while writing):
+def WriteV2JSON(originData, dstFile):
+    nJoint, nMember = len(originData["joint"]), len(originData["member"])
+    with open(dstFile, 'w', encoding='utf-8') as f:
+        for i, (key, items) in enumerate(IterV2Items(originData)):
+            f.write(('{' if i == 0 else ', ') + json.dumps(key) + ': ')
+            if key == "weight":
+                f.write(json.dumps(items))
+                continue
+
+            f.write('[')
+            for j, item in enumerate(items):
+                CheckV2Item(key, item, nJoint, nMember)
+                f.write((', ' if j else '') + json.dumps(item))
+
+            f.write(']')
+
+        f.write('}')
+
+
+# Convert v1 data into the binary format of slientruss3d (See [Truss.DumpIntoBinary]). Each array is written into its .npy file
+# through a memory map [chunkSize] items at a time, so neither the converted items nor a Truss object is held in memory:
+def WriteV2Binary(originData, dstFolder, chunkSize=1 << 16):
+    import numpy as np
+    from slientruss3d.type   import SupportType
+    from slientruss3d.utils  import IsZero
+    from slientruss3d.stream import ArrayBuffer
+
+    nJoint, nMember = len(originData["joint"]), len(originData["member"])
+    dim = len(next(iter(originData["joint"].values()))[0]) if nJoint else 3
+    os.makedirs(dstFolder, exist_ok=True)
+
+    def OpenArray(key, shape, dtype=np.float64):
+        return np.lib.format.open_memmap(os.path.join(dstFolder, f"{key}.npy"), mode='w+', dtype=dtype, shape=shape)
+
+    def IterChunks(key, items):
+        while chunk := list(islice(items, chunkSize)):
+            for item in chunk: CheckV2Item(key, item, nJoint, nMember)
+            yield chunk
+
+    np.save(os.path.join(dstFolder, "dim.npy"), np.array(dim, dtype=np.int64))
+    arrays, supportTypes, weight, start = [], {}, None, 0
+    for key, items in IterV2Items(originData):
+        if key == "joint":
+            positions, supports = OpenArray("joint", (nJoint, dim)), OpenArray("support", (nJoint,), np.int8)
+            for chunk in IterChunks(key, items):
+                for _, supportType in chunk:
+                    if supportType not in supportTypes:
+                        supportTypes[supportType] = SupportType.GetFromString(supportType)
+
+                positions[start: start + len(chunk)] = [vector[:dim] for vector, _ in chunk]
+                supports [start: start + len(chunk)] = [supportTypes[supportType] for _, supportType in chunk]
+                start += len(chunk)
+
+            arrays += [positions, supports]
+
+        elif key == "force":
+            # Zero forces are dropped as [Truss.AddExternalForce] does:
+            forceIDs, forces = ArrayBuffer((), np.int64), ArrayBuffer((dim,))
+            for chunk in IterChunks(key, items):
+                vectors  = np.array([vector[:dim] for _, vector in chunk], dtype=np.float64).reshape(-1, dim)
+                isForced = np.logical_not(IsZero(vectors).all(axis=1))
+                for jointID, vector in zip(np.array([jointID for jointID, _ in chunk])[isForced].tolist(), vectors[isForced]):
+                    forceIDs.Append(jointID)
+                    forces  .Append(vector)
+
+            np.save(os.path.join(dstFolder, "forceJoint.npy"), forceIDs.array)
+            np.save(os.path.join(dstFolder, "force.npy"    ), forces  .array)
+
+        elif key == "member":
+            # The weight is summed member by member as [Truss.weight] does:
+            connects, memberTypes, weight, start = OpenArray("member", (nMember, 2), np.int64), OpenArray("memberType", (nMember, 3)), 0., 0
+            for chunk in IterChunks(key, items):
+                connects   [start: start + len(chunk)] = [connect for connect, _ in chunk]
+                memberTypes[start: start + len(chunk)] = [memberType for _, memberType in chunk]
+                connect, memberType = connects[start: start + len(chunk)], memberTypes[start: start + len(chunk)]
+                lengths = np.sqrt(((positions[connect[:, 1]] - positions[connect[:, 0]]) ** 2.).sum(axis=1))
+                for a, length, density in zip(memberType[:, 0].tolist(), lengths.tolist(), memberType[:, 2].tolist()):
+                    weight += a * length * density
+
+                start += len(chunk)
+
+            arrays += [connects, memberTypes]
+
+        elif key in ("displace", "external", "internal"):
+            results = OpenArray(key, (nMember,) if key == "internal" else (nJoint, dim))
+            for chunk in IterChunks(key, items):
+                for ID, value in chunk: results[ID] = value
+
+            arrays.append(results)
+
+    # Results are dense arrays padded by 0, and the weight is only stored for solved trusses:
+    if "displace" in originData:
+        np.save(os.path.join(dstFolder, "weight.npy"), np.array(weight))
+
+    for array in arrays: array.flush()
+
+
+# Convert one v1 file (given by its path or its raw bytes) in a worker process:
+def ConvertOne(name, dstPath, raw=None, srcFile=None, isBinary=False):
+    if os.path.exists(dstPath):
+        return name, 'skipped', None
+
+    tmpPath = dstPath + '.tmp'
+    try:
+        if raw is None:
+            with open(srcFile, 'rb') as f:
+                raw = f.read()
+
+        originData = json.loads(raw)
+        os.makedirs(os.path.dirname(dstPath) or '.', exist_ok=True)
+
+        # Files which are already in the v2 format are copied through unchanged (or only dumped into the binary format),
+        # so the output folder is complete:
+        if isinstance(originData.get("joint"), list):
+            if isBinary:
+                from slientruss3d.truss import Truss
+                dim = len(originData["joint"][0][0]) if originData["joint"] else 3
+                Truss(dim).LoadFromJSON(data=originData, isOutputFile="displace" in originData).DumpIntoBinary(tmpPath)
+            else:
+                with open(tmpPath, 'wb') as f:
+                    f.write(raw)
+
+            status = 'copied'
+        else:
+            del raw
+            if isBinary:
+                WriteV2Binary(originData, tmpPath)
+            else:
+                WriteV2JSON(originData, tmpPath)
+
+            status = 'converted'
+
+        # Only complete outputs appear at [dstPath], so existing outputs can be skipped safely:
+        os.replace(tmpPath, dstPath)
+        return name, status, None
+
+    except Exception as e:
+        if os.path.isdir(tmpPath):
+            for fileName in os.listdir(tmpPath): os.remove(os.path.join(tmpPath, fileName))
+            os.rmdir(tmpPath)
+        elif os.path.exists(tmpPath):
+            os.remove(tmpPath)
+
+        return name, 'failed', f"{type(e).__name__}: {e}"
+
+
+# Iterate over (name, raw bytes or None, source path or None) of .json files in a folder or a tar archive:
+def IterSources(src):
+    if os.path.isdir(src):
+        for root, _, fileNames in os.walk(src):
+            for fileName in sorted(fileNames):
+                if fileName.endswith('.json'):
+                    srcFile = os.path.join(root, fileName)
+                    yield os.path.relpath(srcFile, src), None, srcFile
+    else:
+        with tarfile.open(src, 'r|*') as tar:
+            for member in tar:
+                if member.isfile() and member.name.endswith('.json'):
+                    yield member.name, tar.extractfile(member).read(), None
+
+
+# Convert all v1 files in a folder or a tar archive in parallel:
+def ForFolder(src, dstFolder, isBinary=False, nWorker=None, nInFlight=None, isPrintMessage=True):
+    nWorker   = os.cpu_count() if nWorker is None else nWorker
+    nInFlight = 2 * nWorker    if nInFlight is None else nInFlight
+    results, pending, sources = [], set(), IterSources(src)
+
+    with ProcessPoolExecutor(max_workers=nWorker) as executor:
+        isExhausted = False
+        while pending or not isExhausted:
+            while len(pending) < nInFlight and not isExhausted:
+                try:
+                    name, raw, srcFile = next(sources)
+                except StopIteration:
+                    isExhausted = True
+                    break
+
+                dstPath = os.path.join(dstFolder, name[:-len('.json')] if isBinary else name)
+                pending.add(executor.submit(ConvertOne, name, dstPath, raw, srcFile, isBinary))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, status, message = result = future.result()
+                results.append(result)
+                if isPrintMessage and status != 'skipped':
+                    print(f"{status :9s} {name}" + (f" ({message})" if message else ""))
+
+    if isPrintMessage:
+        counts = {status: sum(result[1] == status for result in results) for status in ('converted', 'copied', 'skipped', 'failed')}
+        print(f"Files: {len(results)}, converted: {counts['converted']}, copied: {counts['copied']}, skipped: {counts['skipped']}, failed: {counts['failed']}")
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert JSON files of slientruss3d v1 format to v2 format.')
+    parser.add_argument('src'      , help='Folder or tar archive of v1 JSON files.')
+    parser.add_argument('dst'      , help='Folder to write converted files.')
+    parser.add_argument('--binary' , action='store_true', help='Convert to the binary format (See Truss.DumpIntoBinary) instead of JSON.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: number of CPUs).')
+    args = parser.parse_args()
+    ForFolder(args.src, args.dst, args.binary, args.workers)